@@ -1,9 +1,20 @@
 import re
 import os
+import hashlib
+import io
+import json
+import mmap
+import struct
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
 from pytube import YouTube
 from moviepy.editor import AudioFileClip, VideoFileClip
 from pydub import AudioSegment
 from pydub.silence import detect_nonsilent
+from pydub.utils import db_to_float
 
 
 def extract_abr(abr):
@@ -30,7 +41,111 @@ def get_audio_filepath(filename):
     return audio_file_path
 
 
-def convert_mp4_to_wav(mp4_file_path, wav_file_path):
+def get_ffmpeg_binary():
+    # moviepy 가 사용하는 ffmpeg 실행 파일 (imageio-ffmpeg 또는 FFMPEG_BINARY 환경변수)
+    from moviepy.config import get_setting
+
+    return get_setting("FFMPEG_BINARY")
+
+
+def ffmpeg_audio_command(filepath, sample_rate=16000, channels=1, output="-"):
+    """오디오만 디코딩하여 16bit PCM 으로 변환하는 ffmpeg 명령어를 만듭니다.
+
+    output 이 "-" 이면 WAV 헤더 없이 표준 출력으로 내보냅니다.
+    """
+    command = [get_ffmpeg_binary(), "-nostdin", "-loglevel", "error"]
+    command += ["-i", filepath, "-vn", "-ac", str(channels), "-ar", str(sample_rate)]
+    command += ["-acodec", "pcm_s16le"]
+    if output == "-":
+        return command + ["-f", "s16le", "-"]
+    return command + ["-y", output]
+
+
+def run_ffmpeg(command, filepath):
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg 변환 실패 ({filepath}): {result.stderr.decode(errors='ignore').strip()}"
+        )
+    return result.stdout
+
+
+def load_audio(filepath, sample_rate=16000, channels=1):
+    """영상/오디오 파일의 오디오를 WAV 파일 없이 바로 AudioSegment 로 디코딩합니다."""
+    data = run_ffmpeg(ffmpeg_audio_command(filepath, sample_rate, channels), filepath)
+    return AudioSegment(
+        data=data, sample_width=2, frame_rate=sample_rate, channels=channels
+    )
+
+
+def stream_audio(filepath, sample_rate=16000, channels=1, block_ms=10_000):
+    """ffmpeg 으로 디코딩한 오디오를 block_ms 단위의 AudioSegment 로 하나씩 반환합니다."""
+    block_size = int(sample_rate * block_ms / 1000) * 2 * channels
+    process = subprocess.Popen(
+        ffmpeg_audio_command(filepath, sample_rate, channels),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    finished = False
+    try:
+        while True:
+            data = process.stdout.read(block_size)
+            if not data:
+                break
+            yield AudioSegment(
+                data=data, sample_width=2, frame_rate=sample_rate, channels=channels
+            )
+        finished = True
+    finally:
+        # 중간에 멈추면 ffmpeg 프로세스를 종료합니다.
+        if not finished:
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(
+            f"ffmpeg 변환 실패 ({filepath}): {stderr.decode(errors='ignore').strip()}"
+        )
+
+
+def extract_audio(filepath, wav_file_path, sample_rate=16000, channels=1):
+    """ffmpeg 으로 오디오만 디코딩하여 지정한 샘플레이트/채널의 WAV 로 저장합니다."""
+    run_ffmpeg(
+        ffmpeg_audio_command(filepath, sample_rate, channels, wav_file_path), filepath
+    )
+    return wav_file_path
+
+
+def convert_many(
+    filepaths, output_dir="audio", sample_rate=16000, channels=1, max_workers=None
+):
+    """여러 영상/오디오 파일을 병렬로 WAV 로 변환하고, 입력 순서대로 경로를 반환합니다.
+
+    디코딩은 ffmpeg 프로세스가 하므로 스레드 풀로 충분합니다.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    wav_file_paths = [
+        os.path.join(
+            output_dir, os.path.splitext(os.path.basename(filepath))[0] + ".wav"
+        )
+        for filepath in filepaths
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        return list(
+            executor.map(
+                lambda paths: extract_audio(*paths, sample_rate, channels),
+                zip(filepaths, wav_file_paths),
+            )
+        )
+
+
+def convert_mp4_to_wav(mp4_file_path, wav_file_path, sample_rate=None, channels=1):
+    # sample_rate 를 지정하면 ffmpeg 으로 바로 변환합니다. (예: 음성 인식용 16000Hz mono)
+    if sample_rate is not None:
+        return extract_audio(mp4_file_path, wav_file_path, sample_rate, channels)
+
     # MP4 파일 로드
     audio_clip = AudioFileClip(mp4_file_path)
 
@@ -74,51 +189,581 @@ def download_audio_from_youtube(link):
     return new_filepath
 
 
-def extract_audio_from_video(video_filepath):
+def extract_audio_from_video(video_filepath, sample_rate=None, channels=1):
+    audio_filepath = get_audio_filepath(video_filepath.replace(".mp4", ".wav"))
+    # sample_rate 를 지정하면 영상을 디코딩하지 않고 ffmpeg 으로 오디오만 추출합니다.
+    if sample_rate is not None:
+        return extract_audio(video_filepath, audio_filepath, sample_rate, channels)
+
     # MP4 파일 로드
     video = VideoFileClip(video_filepath)
-    audio_filepath = get_audio_filepath(video_filepath.replace(".mp4", ".wav"))
     video.audio.write_audiofile(audio_filepath)
     return audio_filepath
 
 
+def audio_samples(raw_data, sample_width):
+    """PCM 바이트를 정수 샘플 배열로 변환합니다. (24bit 포함)"""
+    if sample_width == 3:
+        data = np.frombuffer(raw_data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = data[:, 0] | (data[:, 1] << 8) | (data[:, 2] << 16)
+        return np.where(samples >= 1 << 23, samples - (1 << 24), samples)
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    return np.frombuffer(raw_data, dtype=dtype)
+
+
+def ms_energy(audio, chunk_ms=10_000):
+    """1ms 구간별 샘플 제곱합과 구간 경계(프레임 번호)를 반환합니다.
+
+    pydub 은 audio[start:end] 를 int(ms * frame_rate / 1000) 프레임으로 자르므로,
+    어떤 구간의 제곱합도 1ms 구간 제곱합의 합으로 정확히 계산할 수 있습니다.
+    메모리를 아끼기 위해 chunk_ms 단위로 나누어 계산합니다.
+    """
+    seg_len = len(audio)
+    channels = audio.channels
+    frame_width = audio.frame_width
+    total_frames = len(audio.raw_data) // frame_width
+    bounds = (np.arange(seg_len + 1) * (audio.frame_rate / 1000.0)).astype(np.int64)
+    clipped = np.minimum(bounds, total_frames)
+    # 32bit 샘플은 제곱합이 uint64 범위를 넘을 수 있어 float64 로 계산합니다.
+    dtype = np.uint64 if audio.sample_width < 4 else np.float64
+
+    energy = np.zeros(seg_len, dtype=dtype)
+    for chunk_start in range(0, seg_len, chunk_ms):
+        chunk_end = min(chunk_start + chunk_ms, seg_len)
+        first, last = clipped[chunk_start], clipped[chunk_end]
+        samples = audio_samples(
+            audio.raw_data[first * frame_width : last * frame_width],
+            audio.sample_width,
+        ).astype(np.int64 if dtype is np.uint64 else np.float64)
+        frame_energy = (samples * samples).reshape(-1, channels).sum(axis=1)
+        cumsum = np.concatenate(
+            [np.zeros(1, dtype), np.cumsum(frame_energy.astype(dtype))]
+        )
+        energy[chunk_start:chunk_end] = (
+            cumsum[clipped[chunk_start + 1 : chunk_end + 1] - first]
+            - cumsum[clipped[chunk_start:chunk_end] - first]
+        )
+    return energy, bounds
+
+
+def detect_silence_numpy(audio, min_silence_len=1000, silence_thresh=-16, seek_step=1):
+    """pydub.silence.detect_silence 와 같은 결과를 NumPy 로 한 번에 계산합니다."""
+    seg_len = len(audio)
+    if seg_len < min_silence_len:
+        return []
+    silence_thresh = db_to_float(silence_thresh) * audio.max_possible_amplitude
+
+    last_slice_start = seg_len - min_silence_len
+    slice_starts = np.arange(0, last_slice_start + 1, seek_step)
+    if last_slice_start % seek_step:
+        slice_starts = np.append(slice_starts, last_slice_start)
+
+    # 구간별 RMS: 누적합의 차이로 모든 구간의 제곱합을 구합니다.
+    # (uint64 누적합은 넘쳐도 구간 차이는 정확합니다)
+    energy, bounds = ms_energy(audio)
+    cumsum = np.concatenate([np.zeros(1, energy.dtype), np.cumsum(energy)])
+    slice_ends = slice_starts + min_silence_len
+    sums = (cumsum[slice_ends] - cumsum[slice_starts]).astype(np.float64)
+    n_samples = (bounds[slice_ends] - bounds[slice_starts]) * audio.channels
+    # audioop.rms 와 같이 소수점 이하를 버립니다.
+    rms = np.zeros(len(slice_starts), dtype=np.float64)
+    nonzero = n_samples > 0
+    rms[nonzero] = np.floor(np.sqrt(sums[nonzero] / n_samples[nonzero]))
+
+    silence_starts = slice_starts[rms <= silence_thresh]
+    if len(silence_starts) == 0:
+        return []
+
+    # 연속되거나 min_silence_len 안에서 겹치는 무음 구간을 합칩니다.
+    gaps = np.diff(silence_starts)
+    breaks = np.flatnonzero((gaps != seek_step) & (gaps > min_silence_len))
+    range_starts = np.concatenate([silence_starts[:1], silence_starts[breaks + 1]])
+    range_ends = np.concatenate([silence_starts[breaks], silence_starts[-1:]])
+    return [
+        [int(start), int(end) + min_silence_len]
+        for start, end in zip(range_starts, range_ends)
+    ]
+
+
+def detect_nonsilent_numpy(
+    audio, min_silence_len=1000, silence_thresh=-16, seek_step=1
+):
+    """pydub.silence.detect_nonsilent 와 같은 결과를 NumPy 로 계산합니다."""
+    silent_ranges = detect_silence_numpy(
+        audio, min_silence_len, silence_thresh, seek_step
+    )
+    len_seg = len(audio)
+    if not silent_ranges:
+        return [[0, len_seg]]
+    if silent_ranges[0][0] == 0 and silent_ranges[0][1] == len_seg:
+        return []
+
+    prev_end_i = 0
+    nonsilent_ranges = []
+    for start_i, end_i in silent_ranges:
+        nonsilent_ranges.append([prev_end_i, start_i])
+        prev_end_i = end_i
+    if end_i != len_seg:
+        nonsilent_ranges.append([prev_end_i, len_seg])
+    if nonsilent_ranges[0] == [0, 0]:
+        nonsilent_ranges.pop(0)
+    return nonsilent_ranges
+
+
+def benchmark_silence_detection(audio, min_silence_len=350, silence_thresh=-35):
+    """pydub 과 NumPy 무음 구간 검출의 결과와 속도를 비교합니다."""
+    start = time.perf_counter()
+    expected = detect_nonsilent(
+        audio, min_silence_len=min_silence_len, silence_thresh=silence_thresh
+    )
+    pydub_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = detect_nonsilent_numpy(
+        audio, min_silence_len=min_silence_len, silence_thresh=silence_thresh
+    )
+    numpy_time = time.perf_counter() - start
+    return {
+        "ranges": len(expected),
+        "identical": expected == result,
+        "pydub_sec": pydub_time,
+        "numpy_sec": numpy_time,
+        "speedup": pydub_time / numpy_time if numpy_time else float("inf"),
+    }
+
+
+def segment_bytes(audio, start, end):
+    """audio[start:end] 와 같은 PCM 데이터를 복사 없이(memoryview) 반환합니다."""
+    start = min(start, len(audio))
+    end = min(end, len(audio))
+    frame_width = audio.frame_width
+    start_frame = int(audio.frame_count(ms=start))
+    end_frame = int(audio.frame_count(ms=end))
+    data = memoryview(audio.raw_data)[
+        start_frame * frame_width : end_frame * frame_width
+    ]
+    # pydub 과 같이 반올림으로 부족한 마지막 프레임은 무음으로 채웁니다.
+    missing = (end_frame - start_frame) * frame_width - len(data)
+    if missing > 0:
+        return [data, bytes(missing)]
+    return [data]
+
+
+def join_segments(audio, ranges):
+    """audio 의 여러 (start, end) 구간을 한 번에 이어 붙입니다.
+
+    AudioSegment 를 += 로 반복해서 더하면 매번 전체 버퍼를 복사하므로,
+    구간 데이터를 모아 한 번의 bytes.join 으로 만듭니다.
+    """
+    if not ranges:
+        return AudioSegment.empty()
+    parts = []
+    for start, end in ranges:
+        parts.extend(segment_bytes(audio, start, end))
+    return audio._spawn(b"".join(parts))
+
+
+class AudioChunkView:
+    """원본 오디오의 (start, end) 구간을 가리키는 가벼운 view 입니다.
+
+    오디오 데이터는 .audio 에 접근할 때 만들어지며,
+    기존과 같이 (audio, start, end) 로 unpacking 할 수 있습니다.
+    """
+
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    @property
+    def audio(self):
+        return self.source[self.start : self.end]
+
+    @property
+    def duration_ms(self):
+        return self.end - self.start
+
+    def __iter__(self):
+        yield self.audio
+        yield self.start
+        yield self.end
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, i):
+        # chunk[1], chunk[2] 는 오디오를 만들지 않도록 .start / .end 를 사용하세요.
+        return tuple(self)[i]
+
+    def __repr__(self):
+        return f"AudioChunkView(start={self.start}, end={self.end})"
+
+
+class MappedWav:
+    """메모리 맵(mmap)으로 연 WAV 파일입니다.
+
+    파일 전체를 메모리에 읽지 않고, 슬라이스(ms 단위)할 때 해당 구간만
+    AudioSegment 로 만듭니다. pydub 이 그대로 읽는 16/32bit PCM 만 지원합니다.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_header(self):
+        data = self._mmap
+        if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+            raise ValueError(f"WAV 파일이 아닙니다: {self.filepath}")
+        fmt = None
+        pos = 12
+        while pos + 8 <= len(data):
+            chunk_id = data[pos : pos + 4]
+            chunk_size = struct.unpack_from("<I", data, pos + 4)[0]
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack_from("<HHIIHH", data, pos + 8)
+            elif chunk_id == b"data":
+                break
+            pos += chunk_size + 8 + (chunk_size & 1)
+        else:
+            raise ValueError(f"data 청크가 없습니다: {self.filepath}")
+        if fmt is None:
+            raise ValueError(f"fmt 청크가 없습니다: {self.filepath}")
+
+        audio_format, self.channels, self.frame_rate, _, _, bits_per_sample = fmt
+        self.sample_width = bits_per_sample // 8
+        if audio_format not in (1, 0xFFFE) or self.sample_width not in (2, 4):
+            raise ValueError(
+                f"지원하지 않는 WAV 형식입니다: format={audio_format}, bits={bits_per_sample}"
+            )
+        self.frame_width = self.channels * self.sample_width
+
+        # 스트리밍으로 기록된 WAV 는 data 크기가 0 이나 0xFFFFFFFF 일 수 있습니다.
+        start = pos + 8
+        size = len(data) - start
+        if 0 < chunk_size < size:
+            size = chunk_size
+        size -= size % self.frame_width
+        self.raw_data = memoryview(data)[start : start + size]
+
+    def close(self):
+        self.raw_data = None
+        self._mmap.close()
+
+    def frame_count(self, ms=None):
+        if ms is not None:
+            return ms * (self.frame_rate / 1000.0)
+        return float(len(self.raw_data) // self.frame_width)
+
+    def __len__(self):
+        return round(1000 * (self.frame_count() / self.frame_rate))
+
+    @property
+    def duration_seconds(self):
+        return self.frame_count() / self.frame_rate
+
+    @property
+    def max_possible_amplitude(self):
+        return 2 ** (self.sample_width * 8) / 2
+
+    def _spawn(self, data):
+        return AudioSegment(
+            data=data,
+            sample_width=self.sample_width,
+            frame_rate=self.frame_rate,
+            channels=self.channels,
+        )
+
+    def __getitem__(self, millisecond):
+        if isinstance(millisecond, slice):
+            start = millisecond.start if millisecond.start is not None else 0
+            end = millisecond.stop if millisecond.stop is not None else len(self)
+        else:
+            start, end = millisecond, millisecond + 1
+        return self._spawn(b"".join(segment_bytes(self, start, end)))
+
+
+def load_wav(filepath, memory_map=True):
+    """WAV 파일을 엽니다. (memory_map=True 이면 가능한 경우 MappedWav 사용)"""
+    if memory_map:
+        try:
+            return MappedWav(filepath)
+        except ValueError:
+            pass
+    return AudioSegment.from_file(filepath, format="wav")
+
+
 class AudioChunk:
-    def __init__(self, filepath, min_silence_len=350, silence_thresh=-35):
-        self.audio = AudioSegment.from_file(filepath, format="wav")
+    def __init__(
+        self,
+        filepath,
+        min_silence_len=350,
+        silence_thresh=-35,
+        use_numpy=True,
+        memory_map=True,
+        audio=None,
+    ):
+        # memory_map=True 이면 WAV 파일을 메모리에 모두 읽지 않고 mmap 으로 엽니다.
+        # audio 를 전달하면 파일을 읽지 않고 그대로 사용합니다.
+        self.audio = audio if audio is not None else load_wav(filepath, memory_map)
         self.filepath = filepath
         self.min_silence_len = min_silence_len
         self.silence_thresh = silence_thresh
+        # True 이면 NumPy 로 무음 구간을 검출합니다. (pydub 과 결과 동일)
+        self.use_numpy = use_numpy
         self.detect_nonsilent_from_audio()
 
+    @classmethod
+    def from_media(cls, filepath, sample_rate=16000, channels=1, **kwargs):
+        """영상/오디오 파일을 WAV 로 저장하지 않고 바로 디코딩하여 AudioChunk 를 만듭니다."""
+        audio = load_audio(filepath, sample_rate, channels)
+        return cls(filepath, audio=audio, **kwargs)
+
     @staticmethod
     def make_audio_chunks(audio, non_silent_times):
-        audio_chunks = []
-        for start, end in non_silent_times:
-            audio_chunks.append((audio[start:end], start, end))
-        return audio_chunks
+        return [AudioChunkView(audio, start, end) for start, end in non_silent_times]
 
     def detect_nonsilent_from_audio(self):
-        non_silent_audio_times = detect_nonsilent(
+        detect = detect_nonsilent_numpy if self.use_numpy else detect_nonsilent
+        non_silent_audio_times = detect(
             self.audio,
             min_silence_len=self.min_silence_len,
             silence_thresh=self.silence_thresh,
         )
-
-        non_silent_audios_output = AudioSegment.empty()
-
-        for i in range(len(non_silent_audio_times)):
-            non_silent_audios_output += self.audio[
-                non_silent_audio_times[i][0] : non_silent_audio_times[i][1]
-            ]
+        self.non_silent_audio_times = non_silent_audio_times
         self.audio_chunks = self.make_audio_chunks(self.audio, non_silent_audio_times)
-        self.non_silent_audios_output = non_silent_audios_output
+        # 무음을 제거한 전체 오디오는 처음 사용할 때 만듭니다.
+        self._non_silent_audios_output = None
         print(f"분석에 사용할 전체 오디오 조각 개수: {len(non_silent_audio_times)}")
 
+    @property
+    def non_silent_audios_output(self):
+        if self._non_silent_audios_output is None:
+            self._non_silent_audios_output = join_segments(
+                self.audio, self.non_silent_audio_times
+            )
+        return self._non_silent_audios_output
+
+    def split_chunks(self, split_time=100):
+        """split_time(초) 단위 구간을 (audio, start, end) view 로 하나씩 반환합니다."""
+        for audio_split_start in range(0, len(self.audio), split_time * 1000):
+            yield AudioChunkView(
+                self.audio,
+                audio_split_start,
+                min(audio_split_start + split_time * 1000, len(self.audio)),
+            )
+
     def audio_splits(self, split_time=100):
+        """split_time(초) 단위로 나눈 오디오를 하나씩 반환합니다. (generator)"""
         splits = int(self.audio.duration_seconds // split_time + 1)
-        audios = []
         for s in range(splits):
             start = s * split_time * 1000
             end = start + split_time * 1000
-            audios.append(self.audio[start:end])
-        return audios
+            yield self.audio[start:end]
+
+
+class OpenAITranscriber:
+    """OpenAI 음성 인식 API(whisper-1 등)로 오디오를 텍스트로 변환합니다."""
+
+    def __init__(self, model="whisper-1", language=None, client=None):
+        from openai import OpenAI
+
+        self.model = model
+        self.language = language
+        self.client = client or OpenAI()
+
+    def __call__(self, audio):
+        buffer = io.BytesIO()
+        audio.export(buffer, format="wav")
+        buffer.name = "chunk.wav"
+        buffer.seek(0)
+        kwargs = {"language": self.language} if self.language else {}
+        result = self.client.audio.transcriptions.create(
+            model=self.model, file=buffer, **kwargs
+        )
+        return result.text
+
+
+class DummyTranscriber:
+    """API 없이 파이프라인을 테스트하기 위한 transcriber 입니다. (길이만 기록)"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def __call__(self, audio):
+        time.sleep(self.delay)
+        return f"[{len(audio)}ms]"
+
+
+def file_fingerprint(filepath):
+    """파일 경로, 크기, 수정 시간으로 파일을 식별합니다."""
+    stat = os.stat(filepath)
+    return {
+        "path": os.path.abspath(filepath),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def transcriber_identity(transcriber):
+    """transcriber 의 종류와 설정(model, language)을 반환합니다."""
+    name = getattr(transcriber, "__qualname__", None) or type(transcriber).__qualname__
+    return {
+        "name": name,
+        "model": getattr(transcriber, "model", None),
+        "language": getattr(transcriber, "language", None),
+    }
+
+
+class TranscriptionPipeline:
+    """오디오 조각을 동시에 음성 인식하고, 결과를 시간순으로 합칩니다.
+
+    - 최대 max_workers 개의 조각을 동시에 처리하며, 실패한 조각은 max_retries 번 재시도합니다.
+    - progress_path 를 지정하면 끝난 조각을 JSONL 로 기록하고,
+      다시 실행할 때 이미 끝난 조각은 건너뜁니다.
+      (원본 파일 source 나 transcriber 가 다른 기록은 사용하지 않고 새로 시작합니다)
+
+    Args:
+        transcriber: 오디오(AudioSegment)를 받아 텍스트를 반환하는 함수
+        source: 조각을 만든 원본 오디오 파일 경로 (진행 기록이 같은 파일의 것인지 확인)
+    """
+
+    def __init__(
+        self,
+        transcriber,
+        max_workers=4,
+        max_retries=3,
+        retry_delay=1.0,
+        progress_path=None,
+        source=None,
+    ):
+        self.transcriber = transcriber
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.progress_path = progress_path
+        self.source = source
+        self.progress_key = None
+        self.lock = threading.Lock()
+
+    def progress_header(self):
+        """진행 기록의 첫 줄에 저장하는 원본 파일, transcriber 정보와 그 해시(key)"""
+        header = {
+            "source": file_fingerprint(self.source) if self.source else None,
+            "transcriber": transcriber_identity(self.transcriber),
+        }
+        raw = json.dumps(header, sort_keys=True, ensure_ascii=False)
+        header["key"] = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+        return header
+
+    def load_progress(self):
+        """progress_path 에 기록된 결과를 {(key, start, end): 결과} 로 반환합니다.
+
+        기록이 없거나 헤더의 원본 파일, transcriber 가 현재와 다르면 헤더만 남기고 새로 시작합니다.
+        """
+        header = self.progress_header()
+        self.progress_key = header["key"]
+        done = {}
+        if self.progress_path is None:
+            return done
+        if os.path.exists(self.progress_path):
+            with open(self.progress_path, encoding="utf-8") as f:
+                try:
+                    saved_header = json.loads(f.readline()).get("header")
+                except (json.JSONDecodeError, AttributeError):
+                    saved_header = None
+                if saved_header == header:
+                    for line in f:
+                        try:
+                            result = json.loads(line)
+                        except json.JSONDecodeError:
+                            # 기록 중 중단되어 잘린 마지막 줄
+                            continue
+                        key = result.pop("key", None)
+                        done[(key, result["start"], result["end"])] = result
+                    return done
+        with open(self.progress_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"header": header}, ensure_ascii=False) + "\n")
+        return done
+
+    def _save_progress(self, result):
+        if self.progress_path is None:
+            return
+        with self.lock:
+            with open(self.progress_path, "a", encoding="utf-8") as f:
+                record = {"key": self.progress_key, **result}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _transcribe(self, chunk, start, end):
+        audio = chunk.audio if isinstance(chunk, AudioChunkView) else chunk[0]
+        for attempt in range(self.max_retries + 1):
+            try:
+                text = self.transcriber(audio)
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.retry_delay * 2**attempt)
+        result = {"start": start, "end": end, "text": text}
+        self._save_progress(result)
+        return result
+
+    def run(self, chunks):
+        """(audio, start, end) 조각들을 음성 인식하여 시작 시간순 결과 목록을 반환합니다.
+
+        일부 조각이 끝내 실패하면 나머지를 모두 처리한 뒤 RuntimeError 를 발생시킵니다.
+        (끝난 조각은 progress_path 에 남아 있으므로 다시 실행하면 이어서 처리합니다)
+        """
+        done = self.load_progress()
+        results = []
+        errors = []
+        pending = set()
+
+        def collect(futures):
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for chunk in chunks:
+                if isinstance(chunk, AudioChunkView):
+                    start, end = chunk.start, chunk.end
+                else:
+                    start, end = chunk[1], chunk[2]
+                if (self.progress_key, start, end) in done:
+                    results.append(done[(self.progress_key, start, end)])
+                    continue
+                # 처리 중인 조각 수를 제한하여 오디오를 한꺼번에 만들지 않습니다.
+                if len(pending) >= self.max_workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                pending.add(executor.submit(self._transcribe, chunk, start, end))
+            collect(wait(pending)[0])
+
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)}개 조각의 음성 인식에 실패했습니다: {errors[0]!r}"
+            ) from errors[0]
+        return sorted(results, key=lambda result: (result["start"], result["end"]))
+
+
+def merge_transcripts(results, sep=" "):
+    """시작 시간순으로 정렬된 음성 인식 결과를 하나의 텍스트로 합칩니다."""
+    return sep.join(result["text"].strip() for result in results if result["text"])
+
+
+if __name__ == "__main__":
+    # 사용법: python audio_utils.py audio/sample.wav
+    import sys
+
+    for filepath in sys.argv[1:]:
+        print(filepath, benchmark_silence_detection(AudioSegment.from_file(filepath)))
@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import sqlite3
+import sys
+import time
+
+import pandas as pd
+from datasets import Dataset
+from langchain_core.runnables import RunnableLambda
+
+# ground_truth 가 있어야 계산할 수 있는 지표
+REFERENCE_METRICS = ("context_recall", "context_precision")
+
+
+def get_metrics(names):
+    """지표 이름 목록으로 ragas 지표 객체를 반환합니다.
+
+    ragas evaluate 는 지표 객체에 llm/embeddings 를 설정했다가 끝나면 None 으로 되돌리므로,
+    동시에 평가하는 스레드끼리 공유하지 않도록 모듈의 지표 객체 대신 복사본을 반환합니다.
+    """
+    from ragas import metrics
+
+    return [copy.copy(getattr(metrics, name)) for name in names]
+
+
+def question_id(question: str) -> str:
+    """실행 간 결과를 비교하기 위한 질문 ID (질문 텍스트의 해시)"""
+    return hashlib.sha1(question.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def load_test_set(path):
+    """question 과 ground_truth(또는 answer) 컬럼이 있는 테스트셋 CSV 를 로드합니다."""
+    df = pd.read_csv(path)
+    if "ground_truth" not in df.columns and "answer" in df.columns:
+        # rag_eval.csv 처럼 정답이 answer 컬럼에 있는 경우
+        df = df.rename(columns={"answer": "ground_truth"})
+    if "contexts" in df.columns:
+        df = df.rename(columns={"contexts": "reference_contexts"})
+    df["question_id"] = df["question"].map(question_id)
+    return df.drop_duplicates("question_id").reset_index(drop=True)
+
+
+class ResultStore:
+    """평가 결과를 SQLite 에 저장합니다. (질문 단위로 저장하므로 중단 후 이어서 실행 가능)"""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                created_at REAL,
+                config TEXT
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                run_id TEXT,
+                question_id TEXT,
+                question TEXT,
+                ground_truth TEXT,
+                answer TEXT,
+                contexts TEXT,
+                scores TEXT,
+                latency REAL,
+                created_at REAL,
+                PRIMARY KEY (run_id, question_id)
+            );
+            """)
+
+    def start_run(self, run_id, config):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO runs VALUES (?, ?, ?)",
+            (run_id, time.time(), json.dumps(config, ensure_ascii=False)),
+        )
+        self.conn.commit()
+
+    def done_ids(self, run_id):
+        rows = self.conn.execute(
+            "SELECT question_id FROM results WHERE run_id = ?", (run_id,)
+        )
+        return {row[0] for row in rows}
+
+    def save(self, run_id, result):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id,
+                result["question_id"],
+                result["question"],
+                result["ground_truth"],
+                result["answer"],
+                json.dumps(result["contexts"], ensure_ascii=False),
+                json.dumps(result["scores"]),
+                result["latency"],
+                time.time(),
+            ),
+        )
+        self.conn.commit()
+
+    def to_pandas(self, run_ids=None):
+        """결과를 지표별 컬럼이 있는 DataFrame 으로 반환합니다."""
+        query = "SELECT * FROM results"
+        params = ()
+        if run_ids:
+            query += f" WHERE run_id IN ({','.join('?' * len(run_ids))})"
+            params = tuple(run_ids)
+        df = pd.read_sql_query(query, self.conn, params=params)
+        scores = pd.DataFrame([json.loads(s) for s in df.pop("scores")], index=df.index)
+        df["contexts"] = df["contexts"].map(json.loads)
+        return pd.concat([df, scores], axis=1)
+
+    def export_parquet(self, path, run_ids=None):
+        self.to_pandas(run_ids).to_parquet(path, index=False)
+
+    def compare_runs(self, run_ids=None):
+        """실행별 지표 평균과 평균 응답 시간을 비교합니다."""
+        df = self.to_pandas(run_ids).drop(columns="created_at")
+        return df.groupby("run_id").mean(numeric_only=True)
+
+
+def pdfrag_answerer(file_path, llm):
+    """myrag.PDFRAG 로 답변과 검색된 context 를 반환하는 비동기 함수를 만듭니다."""
+    from myrag import PDFRAG
+
+    rag = PDFRAG(file_path, llm)
+    retriever = rag.create_retriever()
+    retrieved = {}
+    # 먼저 검색한 결과를 체인에 전달하여 같은 질문을 두 번 검색하지 않습니다.
+    chain = rag.create_chain(RunnableLambda(lambda question: retrieved[question]))
+
+    async def answer(question):
+        docs = await retriever.ainvoke(question)
+        retrieved[question] = docs
+        try:
+            return {
+                "answer": await chain.ainvoke(question),
+                "contexts": [doc.page_content for doc in docs],
+            }
+        finally:
+            retrieved.pop(question, None)
+
+    return answer
+
+
+def score_sample(sample, metrics):
+    """ragas 로 한 샘플의 점수를 계산합니다. (NaN 은 None 으로 저장)"""
+    from ragas import evaluate
+
+    data = {
+        "question": [sample["question"]],
+        "answer": [sample["answer"]],
+        "contexts": [sample["contexts"]],
+    }
+    if sample["ground_truth"] is not None:
+        data["ground_truth"] = [sample["ground_truth"]]
+    row = evaluate(Dataset.from_dict(data), metrics=metrics).to_pandas().iloc[0]
+    return {
+        metric.name: None if math.isnan(row[metric.name]) else float(row[metric.name])
+        for metric in metrics
+    }
+
+
+class BatchEvaluator:
+    """테스트셋 전체에 대해 답변 생성과 ragas 평가를 동시에 실행합니다.
+
+    - 최대 concurrency 개의 질문을 동시에 처리합니다.
+    - 질문마다 결과를 ResultStore 에 저장하고, 같은 run_id 로 다시 실행하면
+      이미 끝난 질문은 건너뜁니다.
+
+    Args:
+        answer: 질문을 받아 {"answer", "contexts"} 를 반환하는 비동기 함수
+        store: ResultStore
+        metrics: ragas 지표 이름 목록
+    """
+
+    def __init__(
+        self,
+        answer,
+        store,
+        metrics=("answer_relevancy", "faithfulness"),
+        concurrency=8,
+        max_retries=2,
+    ):
+        self.answer = answer
+        self.store = store
+        self.metric_names = list(metrics)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+    async def _evaluate_one(self, row, semaphore):
+        ground_truth = row.get("ground_truth")
+        if isinstance(ground_truth, float) and math.isnan(ground_truth):
+            ground_truth = None
+        names = [
+            name
+            for name in self.metric_names
+            if ground_truth is not None or name not in REFERENCE_METRICS
+        ]
+        output, latency = None, None
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    # 평가만 실패한 경우에는 답변을 다시 생성하지 않고 평가만 재시도합니다.
+                    if output is None:
+                        start = time.perf_counter()
+                        output = await self.answer(row["question"])
+                        latency = time.perf_counter() - start
+                    sample = {
+                        "question_id": row["question_id"],
+                        "question": row["question"],
+                        "ground_truth": ground_truth,
+                        "answer": output["answer"],
+                        "contexts": output["contexts"],
+                        "latency": latency,
+                    }
+                    # ragas evaluate 는 자체 이벤트 루프를 사용하므로 스레드에서 실행합니다.
+                    sample["scores"] = await asyncio.to_thread(
+                        score_sample, sample, get_metrics(names)
+                    )
+                    return sample
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+                    await asyncio.sleep(2**attempt)
+
+    async def arun(self, test_set, run_id):
+        """test_set(DataFrame)을 평가하고 (완료 수, 실패 수)를 반환합니다."""
+        done = self.store.done_ids(run_id)
+        rows = [
+            row for row in test_set.to_dict("records") if row["question_id"] not in done
+        ]
+        print(f"[{run_id}] 전체 {len(test_set)}개 중 {len(rows)}개 평가 시작")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._evaluate_one(row, semaphore)) for row in rows
+        ]
+        completed, failed = 0, 0
+        for task in asyncio.as_completed(tasks):
+            try:
+                result = await task
+            except Exception as e:
+                # 실패한 질문은 저장하지 않으므로 다시 실행하면 재시도됩니다.
+                failed += 1
+                print(f"평가 실패: {e!r}", file=sys.stderr)
+                continue
+            self.store.save(run_id, result)
+            completed += 1
+            if completed % 10 == 0:
+                print(f"[{run_id}] {completed}/{len(rows)} 완료")
+        return completed, failed
+
+    def run(self, test_set, run_id):
+        return asyncio.run(self.arun(test_set, run_id))
+
+
+if __name__ == "__main__":
+    # 사용법: python batch_eval.py rag_eval.csv --pdf data/SPRI_AI_Brief_2023년12월호_F.pdf
+    from dotenv import load_dotenv
+    from langchain_openai import ChatOpenAI
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="RAG 배치 평가")
+    parser.add_argument(
+        "test_set", help="question, ground_truth(answer) 컬럼이 있는 CSV"
+    )
+    parser.add_argument("--pdf", default="data/SPRI_AI_Brief_2023년12월호_F.pdf")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--run-id", default=time.strftime("%Y%m%d-%H%M%S"))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--metrics", nargs="+", default=["answer_relevancy", "faithfulness"]
+    )
+    parser.add_argument("--db", default="data/eval_results.db")
+    parser.add_argument("--parquet", default=None, help="결과를 저장할 Parquet 경로")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    store.start_run(args.run_id, vars(args))
+    evaluator = BatchEvaluator(
+        pdfrag_answerer(args.pdf, ChatOpenAI(model=args.model, temperature=0)),
+        store,
+        metrics=args.metrics,
+        concurrency=args.concurrency,
+    )
+    completed, failed = evaluator.run(load_test_set(args.test_set), args.run_id)
+    print(
+        f"완료: {completed}, 실패: {failed} (실패한 질문은 같은 --run-id 로 다시 실행)"
+    )
+    print(store.compare_runs([args.run_id]))
+    if args.parquet:
+        store.export_parquet(args.parquet)
@@ -1,10 +1,11 @@
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.vectorstores import FAISS
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.runnables import RunnablePassthrough
+from embedding_cache import CachedEmbeddings
+from splitter import FastRecursiveCharacterTextSplitter
 
 
 class PDFRAG:
@@ -20,13 +21,15 @@ class PDFRAG:
 
     def split_documents(self, docs):
         # 문서 분할(Split Documents)
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
+        text_splitter = FastRecursiveCharacterTextSplitter(
+            chunk_size=300, chunk_overlap=50
+        )
         split_documents = text_splitter.split_documents(docs)
         return split_documents
 
     def create_vectorstore(self, split_documents):
-        # 임베딩(Embedding) 생성
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        # 임베딩(Embedding) 생성 (이미 임베딩한 청크는 캐시에서 재사용)
+        embeddings = CachedEmbeddings(OpenAIEmbeddings(model="text-embedding-3-small"))
 
         # DB 생성(Create DB) 및 저장
         vectorstore = FAISS.from_documents(
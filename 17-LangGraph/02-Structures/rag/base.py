@@ -6,12 +6,93 @@ from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from abc import ABC, abstractmethod
 from operator import itemgetter
 from langchain import hub
+import asyncio
+import os
+import weakref
+
+from rag.cache import (
+    index_cache_key,
+    has_faiss_index,
+    save_faiss_index,
+    load_faiss_index,
+    index_settings_key,
+)
+from rag.incremental import IncrementalIndex
+from rag.embedding import BatchEmbeddingPipeline
+from rag.embedding_cache import CachedEmbeddings
+from rag.query_cache import CachedRetriever
+from rag.index import (
+    build_ann_vectorstore,
+    set_search_params,
+    batch_similarity_search,
+    SEARCH_PARAMS,
+)
+from rag.hybrid import BM25Index, HybridRetriever
+from rag.ingest import StreamingIngestion
+from rag.utils import format_docs
+
+# 이벤트 루프별 {모델 엔드포인트: 동시 요청 제한 semaphore}
+# (asyncio.run 으로 만든 루프가 끝나면 항목도 함께 사라집니다)
+_model_semaphores = weakref.WeakKeyDictionary()
+
+
+def model_endpoint(model):
+    """동시 요청 제한에 사용할 모델 엔드포인트 이름을 반환합니다."""
+    return ":".join(
+        str(getattr(model, attr, None) or "")
+        for attr in ("model_name", "openai_api_base")
+    )
+
+
+def get_model_semaphore(endpoint, max_concurrency):
+    semaphores = _model_semaphores.setdefault(asyncio.get_running_loop(), {})
+    if endpoint not in semaphores:
+        semaphores[endpoint] = asyncio.Semaphore(max_concurrency)
+    return semaphores[endpoint]
 
 
 class RetrievalChain(ABC):
-    def __init__(self):
-        self.source_uri = None
-        self.k = 10
+    def __init__(self, **kwargs):
+        self.source_uri = kwargs.get("source_uri", None)
+        self.k = kwargs.get("k", 10)
+        self.embeddings = kwargs.get("embeddings", None)
+        # FAISS 인덱스 캐시 디렉토리 (None 이면 매번 새로 임베딩합니다)
+        self.cache_dir = kwargs.get("cache_dir", None)
+        # 변경된 페이지/청크만 다시 임베딩 (cache_dir 가 필요합니다)
+        self.incremental = kwargs.get("incremental", False)
+        # 임베딩 API 주소 (로컬 테스트 서버 등, None 이면 기본 OpenAI 주소)
+        self.embedding_base_url = kwargs.get("embedding_base_url", None)
+        # 동시 임베딩 요청 수 (None 이면 FAISS.from_documents 로 한 번에 임베딩)
+        self.embedding_concurrency = kwargs.get("embedding_concurrency", None)
+        self.tokens_per_minute = kwargs.get("tokens_per_minute", 1_000_000)
+        # 임베딩 결과를 디스크 캐시에 저장하여 같은 청크를 다시 임베딩하지 않습니다.
+        self.embedding_cache = kwargs.get("embedding_cache", True)
+        # 질문 임베딩/검색 결과 캐시 (TTL 초, 최대 개수, 유사 질문 재사용 임계값)
+        self.query_cache = kwargs.get("query_cache", False)
+        self.query_cache_ttl = kwargs.get("query_cache_ttl", 3600)
+        self.query_cache_size = kwargs.get("query_cache_size", 1024)
+        self.query_similarity_threshold = kwargs.get("query_similarity_threshold", None)
+        # FAISS 인덱스 종류("flat", "ivf_flat", "hnsw", "ivf_pq")와 설정
+        # (nlist, hnsw_m, pq_m, pq_nbits, train_size, nprobe, ef_search)
+        # incremental 모드는 항상 flat 인덱스를 사용합니다.
+        self.index_type = kwargs.get("index_type", "flat")
+        self.index_params = kwargs.get("index_params", {})
+        # 검색 방식 ("dense" 또는 Kiwi BM25 + dense 를 합치는 "hybrid")
+        self.retriever_type = kwargs.get("retriever_type", "dense")
+        # hybrid 검색의 지연 시간 한도(초, None 이면 두 검색을 모두 기다립니다)
+        self.latency_budget = kwargs.get("latency_budget", None)
+        # 검색 결과로 만든 context 의 최대 토큰 수 (None 이면 제한 없음)
+        self.max_context_tokens = kwargs.get("max_context_tokens", None)
+        # 캐시된 인덱스의 저장 경로 (캐시를 사용하지 않으면 None)
+        self.index_path = None
+        # 로드/분할/임베딩/인덱싱을 큐로 연결해 동시에 실행 (flat 인덱스에만 적용)
+        self.streaming_ingest = kwargs.get("streaming_ingest", False)
+        # StreamingIngestion 설정 (queue_size, *_workers, batch_size)
+        self.ingest_params = kwargs.get("ingest_params", {})
+        # 모델 엔드포인트별 최대 동시 요청 수 (ainvoke / astream)
+        self.model_concurrency = kwargs.get("model_concurrency", 32)
+        # 캐시된 IVF 인덱스를 메모리 매핑(read-only)으로 로드 (로드 후 문서 추가/삭제 불가)
+        self.mmap_index = kwargs.get("mmap_index", False)
 
     @abstractmethod
     def load_documents(self, source_uris):
@@ -27,21 +108,149 @@ class RetrievalChain(ABC):
         """text splitter를 사용하여 문서를 분할합니다."""
         return text_splitter.split_documents(docs)
 
+    def lazy_load_documents(self, source_uris):
+        """문서를 순차적으로 로드합니다. (스트리밍 인덱싱에 사용)"""
+        for source_uri in source_uris:
+            yield from self.load_documents([source_uri])
+
     def create_embedding(self):
-        return OpenAIEmbeddings(model="text-embedding-3-small")
+        embeddings = OpenAIEmbeddings(
+            model="text-embedding-3-small", base_url=self.embedding_base_url
+        )
+        if self.embedding_cache:
+            return CachedEmbeddings(embeddings)
+        return embeddings
+
+    def embed_documents(self, split_docs, embeddings):
+        if self.embedding_concurrency:
+            return BatchEmbeddingPipeline(
+                embeddings,
+                max_concurrency=self.embedding_concurrency,
+                tokens_per_minute=self.tokens_per_minute,
+            ).embed_all(split_docs)
+        return embeddings.embed_documents([doc.page_content for doc in split_docs])
 
     def create_vectorstore(self, split_docs):
+        if self.index_type != "flat":
+            embeddings = self.create_embedding()
+            return build_ann_vectorstore(
+                split_docs,
+                self.embed_documents(split_docs, embeddings),
+                embeddings,
+                index_type=self.index_type,
+                **self.index_params,
+            )
+        if self.embedding_concurrency:
+            return BatchEmbeddingPipeline(
+                self.create_embedding(),
+                max_concurrency=self.embedding_concurrency,
+                tokens_per_minute=self.tokens_per_minute,
+            ).build_faiss(split_docs)
         return FAISS.from_documents(
             documents=split_docs, embedding=self.create_embedding()
         )
 
+    def ingest_documents(self, text_splitter):
+        """문서를 로드, 분할, 임베딩하여 벡터스토어를 생성합니다."""
+        if self.streaming_ingest and self.index_type == "flat":
+            return StreamingIngestion(
+                self.source_uri,
+                lambda source_uri: self.lazy_load_documents([source_uri]),
+                lambda doc: self.split_documents([doc], text_splitter),
+                self.create_embedding(),
+                **self.ingest_params,
+            ).run()
+        docs = self.load_documents(self.source_uri)
+        split_docs = self.split_documents(docs, text_splitter)
+        return self.create_vectorstore(split_docs)
+
+    def load_or_create_vectorstore(self):
+        """캐시된 인덱스가 있으면 로드하고, 없으면 생성 후 캐시에 저장합니다."""
+        text_splitter = self.create_text_splitter()
+        self.index_path = None
+        if self.cache_dir is None:
+            return self.ingest_documents(text_splitter)
+
+        embeddings = self.create_embedding()
+        if self.incremental:
+            index_path = os.path.join(
+                self.cache_dir,
+                "incremental",
+                index_settings_key(text_splitter, embeddings),
+            )
+            self.index_path = index_path
+            return IncrementalIndex(index_path, embeddings).update(
+                self.source_uri,
+                self.load_documents,
+                lambda docs: self.split_documents(docs, text_splitter),
+            )
+
+        # 검색 시점 설정(nprobe, ef_search)은 로드 후 다시 적용하므로 캐시 키에서 제외합니다.
+        index_params = (
+            {
+                key: value
+                for key, value in self.index_params.items()
+                if key not in SEARCH_PARAMS
+            }
+            | {"index_type": self.index_type}
+            if self.index_type != "flat"
+            else None
+        )
+        cache_key = index_cache_key(
+            self.source_uri, text_splitter, embeddings, index_params
+        )
+        index_path = os.path.join(self.cache_dir, cache_key)
+        self.index_path = index_path
+        if has_faiss_index(index_path):
+            vectorstore = load_faiss_index(index_path, embeddings, mmap=self.mmap_index)
+            set_search_params(
+                vectorstore.index,
+                nprobe=self.index_params.get("nprobe"),
+                ef_search=self.index_params.get("ef_search"),
+            )
+            return vectorstore
+
+        vectorstore = self.ingest_documents(text_splitter)
+        save_faiss_index(vectorstore, index_path)
+        return vectorstore
+
     def create_retriever(self, vectorstore):
+        dense_retriever = self.create_dense_retriever(vectorstore)
+        if self.retriever_type == "hybrid":
+            bm25_path = (
+                os.path.join(self.index_path, "bm25.pkl") if self.index_path else None
+            )
+            return HybridRetriever(
+                dense_retriever=dense_retriever,
+                vectorstore=vectorstore,
+                sparse_index=BM25Index.load_or_build(vectorstore, bm25_path),
+                k=self.k,
+                latency_budget=self.latency_budget,
+            )
+        return dense_retriever
+
+    def create_dense_retriever(self, vectorstore):
+        if self.query_cache:
+            return CachedRetriever(
+                vectorstore=vectorstore,
+                k=self.k,
+                ttl=self.query_cache_ttl,
+                max_size=self.query_cache_size,
+                similarity_threshold=self.query_similarity_threshold,
+            )
         # MMR을 사용하여 검색을 수행하는 retriever를 생성합니다.
         dense_retriever = vectorstore.as_retriever(
             search_type="similarity", search_kwargs={"k": self.k}
         )
         return dense_retriever
 
+    def batch_retrieve(self, questions, k=None):
+        """여러 질문의 검색 결과를 질문 순서대로 한 번에 반환합니다.
+
+        질문 임베딩은 한 번의 요청으로, FAISS 검색은 하나의 행렬 검색으로 처리합니다.
+        """
+        return batch_similarity_search(self.vectorstore, questions, k or self.k)
+
     def create_model(self):
         return ChatOpenAI(model_name="gpt-4o-mini", temperature=0)
 
@@ -53,12 +262,10 @@ class RetrievalChain(ABC):
         return "\n".join(docs)
 
     def create_chain(self):
-        docs = self.load_documents(self.source_uri)
-        text_splitter = self.create_text_splitter()
-        split_docs = self.split_documents(docs, text_splitter)
-        self.vectorstore = self.create_vectorstore(split_docs)
+        self.vectorstore = self.load_or_create_vectorstore()
         self.retriever = self.create_retriever(self.vectorstore)
         model = self.create_model()
+        self.model_endpoint = model_endpoint(model)
         prompt = self.create_prompt()
         self.chain = (
             {
@@ -71,3 +278,34 @@ class RetrievalChain(ABC):
             | StrOutputParser()
         )
         return self
+
+    async def acreate_chain(self):
+        """문서 로드, 인덱싱을 이벤트 루프를 막지 않고 수행합니다."""
+        return await asyncio.to_thread(self.create_chain)
+
+    async def aretrieve(self, question):
+        return await self.retriever.ainvoke(question)
+
+    def format_context(self, docs):
+        """검색된 문서를 중복/겹침을 합치고 토큰 예산에 맞춰 context 로 변환합니다."""
+        return format_docs(docs, max_tokens=self.max_context_tokens)
+
+    async def _with_context(self, inputs):
+        # context 가 없으면 질문으로 검색하여 채웁니다.
+        if "context" not in inputs:
+            docs = await self.aretrieve(inputs["question"])
+            inputs = {**inputs, "context": self.format_context(docs)}
+        return inputs
+
+    async def ainvoke(self, inputs):
+        """검색부터 답변 생성까지 비동기로 실행합니다."""
+        inputs = await self._with_context(inputs)
+        async with get_model_semaphore(self.model_endpoint, self.model_concurrency):
+            return await self.chain.ainvoke(inputs)
+
+    async def astream(self, inputs):
+        """검색 후 답변을 토큰 단위로 비동기 스트리밍합니다."""
+        inputs = await self._with_context(inputs)
+        async with get_model_semaphore(self.model_endpoint, self.model_concurrency):
+            async for token in self.chain.astream(inputs):
+                yield token
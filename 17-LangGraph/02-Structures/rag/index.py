@@ -0,0 +1,151 @@
+import math
+import time
+import warnings
+
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+from rag.embedding_cache import embed_transient
+
+# 지원하는 인덱스 종류
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+# 인덱스를 만든 뒤에도 바꿀 수 있는 검색 시점 설정 (인덱스 캐시 키에서 제외)
+SEARCH_PARAMS = ("nprobe", "ef_search")
+
+
+def create_faiss_index(
+    index_type, dim, n_vectors, nlist=None, hnsw_m=32, pq_m=16, pq_nbits=8
+):
+    """FAISS 인덱스를 생성합니다.
+
+    Args:
+        index_type: "flat"(정확한 검색), "ivf_flat", "hnsw", "ivf_pq"
+        dim: 벡터 차원
+        n_vectors: 인덱싱할 벡터 수 (IVF 클러스터 수 기본값 계산에 사용)
+        nlist: IVF 클러스터 수 (기본값: 4 * sqrt(n_vectors))
+        hnsw_m: HNSW 그래프의 이웃 수
+        pq_m: PQ 부분 벡터 수 (dim 의 약수여야 합니다)
+        pq_nbits: PQ 부분 벡터당 비트 수
+    """
+    import faiss
+
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 index_type 입니다: {index_type}")
+
+    if index_type == "hnsw":
+        return faiss.IndexHNSWFlat(dim, hnsw_m)
+
+    nlist = min(nlist or int(4 * math.sqrt(n_vectors)), n_vectors)
+    if index_type == "ivf_flat" and nlist > 0:
+        return faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist)
+    # PQ 코드북 학습에는 최소 2^nbits 개의 벡터가 필요합니다.
+    if index_type == "ivf_pq" and n_vectors >= 2**pq_nbits:
+        return faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, pq_m, pq_nbits)
+
+    if index_type != "flat":
+        warnings.warn(
+            f"벡터 수({n_vectors})가 부족하여 {index_type} 대신 flat 인덱스를 사용합니다."
+        )
+    return faiss.IndexFlatL2(dim)
+
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """검색 정확도/속도 파라미터를 설정합니다."""
+    import faiss
+
+    if nprobe is not None and hasattr(index, "nprobe"):
+        index.nprobe = nprobe
+    if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+
+def build_ann_vectorstore(
+    docs,
+    vectors,
+    embeddings,
+    index_type="flat",
+    train_size=100_000,
+    nprobe=None,
+    ef_search=None,
+    seed=42,
+    **index_kwargs,
+):
+    """임베딩된 문서로 지정한 종류의 FAISS 벡터스토어를 생성합니다.
+
+    IVF 계열 인덱스는 최대 train_size 개의 샘플 벡터로 학습합니다.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    index = create_faiss_index(
+        index_type, vectors.shape[1], len(vectors), **index_kwargs
+    )
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        sample_ids = rng.choice(
+            len(vectors), min(train_size, len(vectors)), replace=False
+        )
+        index.train(vectors[sample_ids])
+    set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+
+    vectorstore = FAISS(embeddings, index, InMemoryDocstore(), {})
+    vectorstore.add_embeddings(
+        [(doc.page_content, vector) for doc, vector in zip(docs, vectors)],
+        metadatas=[doc.metadata for doc in docs],
+    )
+    return vectorstore
+
+
+def recall_report(index, vectors, query_vectors, k=10):
+    """근사 인덱스의 recall@k 와 질의당 검색 시간을 정확한(flat) 인덱스와 비교합니다."""
+    import faiss
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    query_vectors = np.asarray(query_vectors, dtype=np.float32)
+    exact_index = faiss.IndexFlatL2(vectors.shape[1])
+    exact_index.add(vectors)
+
+    start = time.perf_counter()
+    _, exact_ids = exact_index.search(query_vectors, k)
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, ann_ids = index.search(query_vectors, k)
+    ann_time = time.perf_counter() - start
+
+    recall = np.mean(
+        [
+            len(set(exact_row) & set(ann_row)) / k
+            for exact_row, ann_row in zip(exact_ids, ann_ids)
+        ]
+    )
+    return {
+        "recall@k": float(recall),
+        "exact_ms_per_query": exact_time * 1000 / len(query_vectors),
+        "ann_ms_per_query": ann_time * 1000 / len(query_vectors),
+    }
+
+
+def batch_similarity_search(vectorstore, questions, k=4):
+    """여러 질문을 한 번에 임베딩하고, 하나의 FAISS 행렬 검색으로 질문별 결과를 반환합니다.
+
+    질문 임베딩은 문서 임베딩 디스크 캐시에 저장하지 않습니다.
+    """
+    import faiss
+
+    if not questions:
+        return []
+    vectors = np.asarray(
+        embed_transient(vectorstore.embeddings, list(questions)), dtype=np.float32
+    )
+    if vectorstore._normalize_L2:
+        faiss.normalize_L2(vectors)
+    _, indices = vectorstore.index.search(vectors, k)
+    return [
+        [
+            vectorstore.docstore.search(vectorstore.index_to_docstore_id[i])
+            for i in row
+            if i != -1
+        ]
+        for row in indices
+    ]
@@ -0,0 +1,178 @@
+import queue
+import threading
+
+from langchain_community.vectorstores import FAISS
+
+# 스테이지 종료를 알리는 표시
+_DONE = object()
+
+
+class PipelineStopped(Exception):
+    """다른 스테이지에서 오류가 발생하여 파이프라인이 중단되었습니다."""
+
+
+class StreamingIngestion:
+    """로드 → 분할 → 임베딩 → 인덱싱을 크기가 제한된 큐로 연결해 동시에 실행합니다.
+
+    각 스테이지는 자체 스레드 풀에서 실행되며, 큐가 가득 차면 앞 스테이지가 기다리므로
+    (backpressure) 말뭉치 크기와 관계없이 처리 중인 페이지/청크 수가 일정하게 유지됩니다.
+
+    Args:
+        source_uris: 로드할 파일 경로 목록
+        load: 파일 경로 하나를 받아 페이지 Document 를 순차적으로 반환하는 함수
+        split: 페이지 Document 하나를 받아 청크 목록을 반환하는 함수
+        embeddings: 청크를 임베딩할 Embeddings
+        queue_size: 스테이지 사이 큐의 최대 크기
+        load_workers / split_workers / embed_workers: 스테이지별 스레드 수
+        batch_size: 임베딩 요청 1회에 포함할 청크 수
+    """
+
+    def __init__(
+        self,
+        source_uris,
+        load,
+        split,
+        embeddings,
+        queue_size=64,
+        load_workers=2,
+        split_workers=2,
+        embed_workers=4,
+        batch_size=64,
+    ):
+        self.source_uris = source_uris
+        self.load = load
+        self.split = split
+        self.embeddings = embeddings
+        self.queue_size = queue_size
+        self.load_workers = load_workers
+        self.split_workers = split_workers
+        self.embed_workers = embed_workers
+        self.batch_size = batch_size
+        self.stop = threading.Event()
+        self.errors = []
+
+    def _put(self, q, item):
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise PipelineStopped()
+
+    def _get(self, q):
+        while not self.stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        raise PipelineStopped()
+
+    def _start_stage(self, fn, inbox, outbox, n_workers, flush=None):
+        """inbox 의 항목마다 fn 을 실행하고 결과를 outbox 로 보내는 스레드를 시작합니다."""
+        remaining = [n_workers]
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                while True:
+                    item = self._get(inbox)
+                    if item is _DONE:
+                        # 같은 스테이지의 다른 스레드도 종료할 수 있도록 되돌려 놓습니다.
+                        self._put(inbox, _DONE)
+                        break
+                    for result in fn(item):
+                        self._put(outbox, result)
+                if flush is not None:
+                    for result in flush():
+                        self._put(outbox, result)
+            except PipelineStopped:
+                return
+            except BaseException as e:
+                self.errors.append(e)
+                self.stop.set()
+                return
+            with lock:
+                remaining[0] -= 1
+                is_last = remaining[0] == 0
+            if is_last:
+                self._put(outbox, _DONE)
+
+        threads = [
+            threading.Thread(target=worker, daemon=True) for _ in range(n_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _embed(self, batch):
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in batch])
+        yield batch, vectors
+
+    def run(self):
+        """파이프라인을 실행하고 FAISS 벡터스토어를 반환합니다."""
+        sources, pages, chunks, batches, embedded = (
+            queue.Queue(maxsize=self.queue_size) for _ in range(5)
+        )
+
+        # 청크를 batch_size 개씩 묶는 스테이지 (단일 스레드)
+        buffer = []
+
+        def to_batches(chunk):
+            buffer.append(chunk)
+            if len(buffer) >= self.batch_size:
+                yield buffer[:]
+                buffer.clear()
+
+        def flush_batches():
+            if buffer:
+                yield buffer[:]
+
+        threads = []
+        threads += self._start_stage(self.load, sources, pages, self.load_workers)
+        threads += self._start_stage(self.split, pages, chunks, self.split_workers)
+        threads += self._start_stage(to_batches, chunks, batches, 1, flush_batches)
+        threads += self._start_stage(self._embed, batches, embedded, self.embed_workers)
+
+        feeder = threading.Thread(
+            target=self._feed_sources, args=(sources,), daemon=True
+        )
+        feeder.start()
+
+        vectorstore = None
+        try:
+            while True:
+                item = self._get(embedded)
+                if item is _DONE:
+                    break
+                batch, vectors = item
+                text_embeddings = [
+                    (doc.page_content, vector) for doc, vector in zip(batch, vectors)
+                ]
+                metadatas = [doc.metadata for doc in batch]
+                if vectorstore is None:
+                    vectorstore = FAISS.from_embeddings(
+                        text_embeddings, self.embeddings, metadatas=metadatas
+                    )
+                else:
+                    vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
+        except PipelineStopped:
+            pass
+        finally:
+            self.stop.set()
+            for thread in [feeder, *threads]:
+                thread.join()
+
+        if self.errors:
+            raise self.errors[0]
+        if vectorstore is None:
+            raise ValueError("인덱싱할 문서가 없습니다.")
+        return vectorstore
+
+    def _feed_sources(self, sources):
+        try:
+            for source_uri in self.source_uris:
+                self._put(sources, source_uri)
+            self._put(sources, _DONE)
+        except PipelineStopped:
+            pass
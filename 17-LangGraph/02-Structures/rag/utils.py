@@ -1,10 +1,107 @@
-def format_docs(docs):
-    return "\n".join(
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken 미설치 또는 인코딩 파일을 받을 수 없는 오프라인 환경
+        return None
+
+
+@lru_cache(maxsize=100_000)
+def count_tokens(text):
+    """텍스트의 토큰 수를 반환합니다. (tiktoken 이 없으면 글자 수로 근사)"""
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def merge_chunks(first, second):
+    """같은 페이지의 두 청크 (content, start_index) 를 하나로 합칩니다. (합칠 수 없으면 None)
+
+    start_index 가 있으면 원문에서 실제로 겹치거나 이어지는 청크만 합치고,
+    없으면 한 청크가 다른 청크에 포함된 경우(중복)만 합칩니다.
+    """
+    (content1, start1), (content2, start2) = first, second
+    if start1 is None or start2 is None:
+        if content2 in content1:
+            return first
+        if content1 in content2:
+            return second
+        return None
+    if start2 < start1:
+        (content1, start1), (content2, start2) = second, first
+    end1 = start1 + len(content1)
+    if start2 > end1:
+        return None
+    overlap = content1[start2 - start1 : start2 - start1 + len(content2)]
+    if not content2.startswith(overlap):
+        # start_index 가 내용과 맞지 않으면(오래된 metadata 등) 겹친다고 보지 않고 이어 붙입니다.
+        return content1 + content2, start1
+    # 두 청크 모두 원문의 일부이므로 합친 결과는 원문[start1:max(end1, end2)] 와 같습니다.
+    return content1 + content2[len(overlap) :], start1
+
+
+def pack_docs(docs):
+    """같은 페이지의 중복/겹치는 청크를 하나로 합칩니다.
+
+    합쳐진 청크는 순위가 더 높은 청크의 위치에 놓입니다.
+
+    Returns:
+        (page_content, metadata) 목록
+    """
+    blocks = [
         [
-            f"<document><content>{doc.page_content}</content><source>{doc.metadata['source']}</source><page>{int(doc.metadata['page'])+1}</page></document>"
-            for doc in docs
+            (doc.page_content, doc.metadata.get("start_index")),
+            doc.metadata,
+            (doc.metadata.get("source"), doc.metadata.get("page")),
         ]
-    )
+        for doc in docs
+    ]
+    # 더 이상 합칠 청크가 없을 때까지 반복합니다. (A-B, B-C 가 겹치면 A-B-C 로 합쳐짐)
+    merged_any = True
+    while merged_any:
+        merged_any = False
+        for i, first in enumerate(blocks):
+            for j in range(i + 1, len(blocks)):
+                second = blocks[j]
+                if first is None or second is None or first[2] != second[2]:
+                    continue
+                merged = merge_chunks(first[0], second[0])
+                if merged is not None:
+                    first[0] = merged
+                    blocks[j] = None
+                    merged_any = True
+        blocks = [block for block in blocks if block is not None]
+    return [(chunk[0], metadata) for chunk, metadata, _ in blocks]
+
+
+def format_doc(content, metadata):
+    return f"<document><content>{content}</content><source>{metadata['source']}</source><page>{int(metadata['page'])+1}</page></document>"
+
+
+def format_docs(docs, max_tokens=None):
+    """검색된 문서를 XML 형식의 context 로 변환합니다.
+
+    같은 페이지의 중복/겹치는 청크는 하나로 합치고, max_tokens 를 지정하면
+    순위가 높은 문서부터 토큰 예산 안에 들어가는 문서만 포함합니다.
+    """
+    formatted = []
+    total_tokens = 0
+    for content, metadata in pack_docs(docs):
+        doc_text = format_doc(content, metadata)
+        if max_tokens is not None:
+            n_tokens = count_tokens(doc_text)
+            if total_tokens + n_tokens > max_tokens:
+                continue
+            total_tokens += n_tokens
+        formatted.append(doc_text)
+    return "\n".join(formatted)
 
 
 def format_searched_docs(docs):
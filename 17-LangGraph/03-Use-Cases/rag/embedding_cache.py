@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# 여러 프로젝트(Streamlit 앱, 평가, LangGraph 예제)가 함께 사용하는 캐시 파일 경로
+DEFAULT_CACHE_PATH = os.environ.get(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "langchain-kr", "embeddings.db"),
+)
+
+
+def normalize_text(text: str) -> str:
+    """유니코드 정규화 후 연속된 공백을 하나로 합칩니다."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def embedding_namespace(embeddings) -> str:
+    """캐시 키에 사용할 임베딩 이름 (모델 + API 주소 + 차원 수)
+
+    다른 엔드포인트(로컬 테스트 서버 등)나 차원 수로 만든 벡터가 섞이지 않도록 구분합니다.
+    기본 주소와 기본 차원 수는 모델 이름만 사용하므로 기존 캐시를 그대로 사용할 수 있습니다.
+    """
+    name = getattr(embeddings, "model", None) or type(embeddings).__name__
+    base_url = getattr(embeddings, "openai_api_base", None)
+    dimensions = getattr(embeddings, "dimensions", None)
+    if base_url:
+        name = f"{name}@{base_url.rstrip('/')}"
+    if dimensions:
+        name = f"{name}:{dimensions}"
+    return name
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    raw = f"{model}\0{normalize_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """(모델, 정규화된 텍스트 해시) 를 키로 벡터를 저장하는 SQLite 기반 디스크 캐시입니다.
+
+    Args:
+        path: SQLite 파일 경로
+        max_entries: 저장할 최대 벡터 수 (초과하면 가장 오래 사용하지 않은 항목부터 삭제)
+        dtype: 저장할 벡터 타입 ("float32" 또는 "float16")
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 1_000_000,
+        dtype: str = "float32",
+    ):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, dtype TEXT, vector BLOB, last_access REAL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_access "
+            "ON embeddings(last_access)"
+        )
+        self.conn.commit()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """캐시된 벡터 목록을 반환합니다. (캐시에 없으면 None)"""
+        keys = [embedding_cache_key(model, text) for text in texts]
+        found = {}
+        with self.lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회합니다.
+            for i in range(0, len(keys), 500):
+                batch = list(set(keys[i : i + 500]))
+                rows = self.conn.execute(
+                    "SELECT key, dtype, vector FROM embeddings WHERE key IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, dtype, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=dtype).astype(np.float32)
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self.conn.commit()
+            results = [found.get(key) for key in keys]
+            n_hits = sum(result is not None for result in results)
+            self.hits += n_hits
+            self.misses += len(results) - n_hits
+        return results
+
+    def set_many(self, model: str, texts: List[str], vectors) -> None:
+        now = time.time()
+        rows = [
+            (
+                embedding_cache_key(model, text),
+                self.dtype.name,
+                np.asarray(vector, dtype=self.dtype).tobytes(),
+                now,
+            )
+            for text, vector in zip(texts, vectors)
+        ]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                "SELECT key FROM embeddings ORDER BY last_access LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> dict:
+        """캐시 적중/미적중 통계를 반환합니다."""
+        with self.lock:
+            (entries,) = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache(path: str = DEFAULT_CACHE_PATH) -> EmbeddingCache:
+    """경로별로 하나의 EmbeddingCache 를 공유합니다."""
+    return EmbeddingCache(path)
+
+
+class CachedEmbeddings(Embeddings):
+    """EmbeddingCache 에 없는 텍스트만 실제 임베딩 모델로 임베딩합니다."""
+
+    def __init__(self, embeddings: Embeddings, cache: Optional[EmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.cache = cache or get_embedding_cache()
+        # 캐시 키와 인덱스 캐시 키에 사용할 이름 (모델 + API 주소 + 차원 수)
+        self.model = embedding_namespace(embeddings)
+
+    def _missing(self, texts, cached):
+        # 같은 배치 안의 중복 텍스트는 한 번만 임베딩합니다.
+        missing = {}
+        for text, vector in zip(texts, cached):
+            if vector is None:
+                missing.setdefault(embedding_cache_key(self.model, text), text)
+        return list(missing.values())
+
+    def _merge(self, texts, cached, missing, vectors):
+        new_vectors = {
+            embedding_cache_key(self.model, text): vector
+            for text, vector in zip(missing, vectors)
+        }
+        return [
+            (
+                vector.tolist()
+                if vector is not None
+                else list(new_vectors[embedding_cache_key(self.model, text)])
+            )
+            for text, vector in zip(texts, cached)
+        ]
+
+    def embed_documents(
+        self, texts: List[str], store: bool = True
+    ) -> List[List[float]]:
+        """store=False 이면 캐시에서 읽기만 하고, 새로 임베딩한 벡터는 저장하지 않습니다."""
+        cached = self.cache.get_many(self.model, texts)
+        missing = self._missing(texts, cached)
+        vectors = self.embeddings.embed_documents(missing) if missing else []
+        if missing and store:
+            self.cache.set_many(self.model, missing, vectors)
+        return self._merge(texts, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        cached = await asyncio.to_thread(self.cache.get_many, self.model, texts)
+        missing = self._missing(texts, cached)
+        vectors = await self.embeddings.aembed_documents(missing) if missing else []
+        if missing:
+            await asyncio.to_thread(self.cache.set_many, self.model, missing, vectors)
+        return self._merge(texts, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+
+def embed_transient(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """질문, 답변처럼 한 번만 사용하는 텍스트를 한 번의 요청으로 임베딩합니다.
+
+    CachedEmbeddings 이면 캐시된 벡터(인덱싱한 청크 등)는 재사용하지만, 새 벡터는 디스크 캐시에 저장하지 않습니다.
+    """
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_documents(texts, store=False)
+    return embeddings.embed_documents(texts)
@@ -0,0 +1,163 @@
+import hashlib
+import math
+import os
+import pickle
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# dense / sparse 검색을 동시에 실행하기 위한 공용 스레드 풀
+executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+@lru_cache(maxsize=1)
+def get_kiwi():
+    from kiwipiepy import Kiwi
+
+    return Kiwi()
+
+
+def kiwi_tokenize(text: str) -> List[str]:
+    """Kiwi 형태소 분석기로 한국어 텍스트를 토큰화합니다."""
+    return [token.form for token in get_kiwi().tokenize(text)]
+
+
+def docstore_fingerprint(vectorstore) -> str:
+    """FAISS docstore 에 포함된 문서 ID 목록의 해시를 반환합니다."""
+    ids = sorted(vectorstore.index_to_docstore_id.values())
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+
+class BM25Index:
+    """FAISS docstore 의 문서로 만든 BM25 역색인입니다.
+
+    역색인(단어 → 문서 번호/빈도 배열)을 미리 만들어 두고 pickle 로 저장하므로,
+    다시 로드할 때 형태소 분석을 반복하지 않습니다.
+    """
+
+    def __init__(self, doc_ids, postings, doc_lens, k1=1.5, b=0.75, fingerprint=None):
+        self.doc_ids = doc_ids
+        self.postings = postings
+        self.doc_lens = doc_lens
+        self.avgdl = float(doc_lens.mean()) if len(doc_lens) else 0.0
+        self.k1 = k1
+        self.b = b
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, k1=1.5, b=0.75):
+        doc_ids = [
+            vectorstore.index_to_docstore_id[i]
+            for i in sorted(vectorstore.index_to_docstore_id)
+        ]
+        postings = defaultdict(lambda: ([], []))
+        doc_lens = []
+        for i, doc_id in enumerate(doc_ids):
+            tokens = kiwi_tokenize(vectorstore.docstore.search(doc_id).page_content)
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term][0].append(i)
+                postings[term][1].append(tf)
+        postings = {
+            term: (np.array(ids, dtype=np.int32), np.array(tfs, dtype=np.float32))
+            for term, (ids, tfs) in postings.items()
+        }
+        return cls(
+            doc_ids,
+            postings,
+            np.array(doc_lens, dtype=np.float32),
+            k1=k1,
+            b=b,
+            fingerprint=docstore_fingerprint(vectorstore),
+        )
+
+    @classmethod
+    def load_or_build(cls, vectorstore, path=None):
+        """저장된 역색인이 현재 docstore 와 일치하면 로드하고, 아니면 새로 만들어 저장합니다."""
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                index = pickle.load(f)
+            if index.fingerprint == docstore_fingerprint(vectorstore):
+                return index
+        index = cls.from_vectorstore(vectorstore)
+        if path is not None:
+            index.save(path)
+        return index
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+    def search(self, query: str, k: int):
+        """(docstore ID, 점수) 목록을 점수 내림차순으로 반환합니다."""
+        n_docs = len(self.doc_ids)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lens / (self.avgdl or 1.0))
+        for term in set(kiwi_tokenize(query)):
+            if term not in self.postings:
+                continue
+            ids, tfs = self.postings[term]
+            idf = math.log(1 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm[ids])
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.doc_ids[i], float(scores[i])) for i in top]
+
+
+def reciprocal_rank_fusion(result_lists, k: int, rrf_k: int = 60) -> List[Document]:
+    """여러 검색 결과를 Reciprocal Rank Fusion 으로 합칩니다."""
+    scores = defaultdict(float)
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            key = doc.id or (doc.page_content, str(sorted(doc.metadata.items())))
+            scores[key] += 1 / (rrf_k + rank + 1)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ranked[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """dense 검색과 Kiwi BM25 검색을 병렬로 실행하고 RRF 로 결과를 합칩니다.
+
+    latency_budget(초) 안에 끝나지 않은 검색 결과는 제외합니다.
+    (둘 다 끝나지 않았다면 먼저 끝나는 결과를 사용합니다)
+    """
+
+    dense_retriever: Any
+    vectorstore: Any
+    sparse_index: Any
+    k: int = 4
+    rrf_k: int = 60
+    latency_budget: Optional[float] = None
+
+    def _sparse_search(self, query):
+        return [
+            self.vectorstore.docstore.search(doc_id)
+            for doc_id, _ in self.sparse_index.search(query, self.k)
+        ]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        futures = [
+            executor.submit(self.dense_retriever.invoke, query),
+            executor.submit(self._sparse_search, query),
+        ]
+        done, _ = wait(futures, timeout=self.latency_budget)
+        if not done:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        results = [future.result() for future in futures if future in done]
+        return reciprocal_rank_fusion(results, self.k, self.rrf_k)
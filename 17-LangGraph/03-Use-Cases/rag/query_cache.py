@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from rag.embedding_cache import normalize_text
+
+
+class TTLCache:
+    """만료 시간(TTL)과 최대 크기(LRU)를 가진 메모리 캐시입니다."""
+
+    def __init__(self, max_size=1024, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + self.ttl)
+            self.data.move_to_end(key)
+            while len(self.data) > self.max_size:
+                self.data.popitem(last=False)
+
+    def items(self):
+        """만료되지 않은 (key, value) 목록을 반환합니다."""
+        now = time.monotonic()
+        with self.lock:
+            return [
+                (key, value)
+                for key, (value, expires_at) in self.data.items()
+                if expires_at >= now
+            ]
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+class CachedRetriever(BaseRetriever):
+    """질문 임베딩과 검색 결과(top-k)를 캐시하는 FAISS retriever 입니다.
+
+    - 같은 질문(공백/유니코드 정규화 기준)은 임베딩과 검색을 모두 생략합니다.
+    - similarity_threshold 를 지정하면 코사인 유사도가 임계값 이상인 이전 질문의 결과를 재사용합니다.
+    - 인덱스가 바뀌면(다른 인덱스로 교체, 문서 추가/삭제) 캐시를 비웁니다.
+    """
+
+    vectorstore: Any
+    k: int = 4
+    ttl: float = 3600
+    max_size: int = 1024
+    similarity_threshold: Optional[float] = None
+    embedding_cache: Any = None
+    result_cache: Any = None
+    cached_version: Any = None
+
+    def model_post_init(self, __context):
+        self.embedding_cache = TTLCache(self.max_size, self.ttl)
+        self.result_cache = TTLCache(self.max_size, self.ttl)
+        self.cached_version = self.index_version()
+
+    def index_version(self):
+        """인덱스 변경 여부를 확인할 값 (인덱스 객체, 벡터 수)"""
+        index = self.vectorstore.index
+        return id(index), index.ntotal
+
+    def clear(self):
+        self.embedding_cache.clear()
+        self.result_cache.clear()
+
+    def _check_version(self):
+        version = self.index_version()
+        if version != self.cached_version:
+            self.clear()
+            self.cached_version = version
+
+    def _find_similar(self, query_vector):
+        """임계값 이상으로 유사한 이전 질문의 검색 결과를 찾습니다."""
+        # 항목마다 get 을 호출하면 모든 항목이 최근 사용으로 표시되므로, 한 번에 조회만 합니다.
+        results = dict(self.result_cache.items())
+        cached = [
+            (key, vector)
+            for key, vector in self.embedding_cache.items()
+            if key in results
+        ]
+        if not cached:
+            return None
+        keys = [key for key, _ in cached]
+        matrix = np.array([vector for _, vector in cached], dtype=np.float32)
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = (
+            matrix
+            @ query
+            / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+        )
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            # 재사용한 결과만 최근 사용으로 표시합니다.
+            self.result_cache.get(keys[best])
+            return results[keys[best]]
+        return None
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        self._check_version()
+        key = normalize_text(query)
+
+        docs = self.result_cache.get(key)
+        if docs is not None:
+            return list(docs)
+
+        query_vector = self.embedding_cache.get(key)
+        if query_vector is None:
+            query_vector = self.vectorstore.embeddings.embed_query(query)
+            self.embedding_cache.set(key, query_vector)
+
+        if self.similarity_threshold is not None:
+            docs = self._find_similar(query_vector)
+            if docs is not None:
+                return list(docs)
+
+        docs = self.vectorstore.similarity_search_by_vector(query_vector, k=self.k)
+        self.result_cache.set(key, docs)
+        return list(docs)
@@ -0,0 +1,145 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = ".cache/csv"
+
+# 변환 규칙이 바뀌면 올려서 이전 캐시를 사용하지 않도록 합니다.
+CACHE_VERSION = 2
+
+
+def file_hash(file, chunk_size=8 * 1024 * 1024):
+    """파일 경로 또는 업로드된 파일(UploadedFile, BytesIO)의 내용 해시를 반환합니다."""
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            while chunk := f.read(chunk_size):
+                h.update(chunk)
+    elif hasattr(file, "getbuffer"):
+        # 메모리에 있는 업로드 파일은 복사 없이 해시합니다.
+        h.update(file.getbuffer())
+    else:
+        file.seek(0)
+        while chunk := file.read(chunk_size):
+            h.update(chunk)
+        file.seek(0)
+    return h.hexdigest()
+
+
+def _string_dtype():
+    # pandas 3 부터 pd.read_csv 는 문자열 컬럼을 str(StringDtype) 으로 읽습니다.
+    try:
+        if pd.get_option("future.infer_string"):
+            return pd.StringDtype(na_value=np.nan)
+    except (KeyError, AttributeError):
+        pass
+    return None
+
+
+def read_arrow_table(file):
+    """pyarrow 로 CSV 를 읽습니다. (멀티스레드)
+
+    pyarrow 는 ISO 형식의 날짜/시간을 date/timestamp 로 변환하지만 pd.read_csv 는 문자열로
+    읽으므로, 타입을 추론하는 첫 블록에서 날짜/시간으로 추론된 컬럼은 문자열로 읽습니다.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    # pd.read_csv 와 같이 빈 문자열도 결측값으로 읽습니다.
+    convert_options = pv.ConvertOptions(strings_can_be_null=True)
+    reader = pv.open_csv(file, convert_options=convert_options)
+    convert_options.column_types = {
+        field.name: pa.string()
+        for field in reader.schema
+        if pa.types.is_temporal(field.type)
+    }
+    reader.close()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    table = pv.read_csv(file, convert_options=convert_options)
+
+    # 값이 모두 비어 있는 컬럼은 pd.read_csv 와 같이 float64 로 변환합니다.
+    schema = table.schema
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.float64()))
+    return table.cast(schema)
+
+
+def read_csv(file):
+    """CSV 를 pd.read_csv 와 같은 타입으로 읽습니다. (pyarrow 가 있으면 멀티스레드)
+
+    pyarrow 가 없거나 읽을 수 없는 파일(UTF-8 이 아닌 인코딩 등)은 기본 엔진으로 읽습니다.
+    """
+    try:
+        table = read_arrow_table(file)
+    except (ImportError, ValueError):
+        # pyarrow.ArrowInvalid 는 ValueError 의 하위 클래스입니다.
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return pd.read_csv(file)
+
+    string_dtype = _string_dtype()
+    types_mapper = None
+    if string_dtype is not None:
+        import pyarrow as pa
+
+        types_mapper = {pa.string(): string_dtype, pa.large_string(): string_dtype}.get
+    return table.to_pandas(types_mapper=types_mapper)
+
+
+def optimize_dtypes(df, category_ratio=0.5, downcast=False):
+    """컬럼 타입을 줄여 메모리 사용량을 줄입니다.
+
+    - 문자열: 고유값 비율이 category_ratio 이하이면 category
+    - downcast=True 이면 숫자 컬럼도 줄입니다. 값은 같지만 연산 결과의 타입도 작아지므로
+      (int32 곱셈 오버플로, float32 정밀도) 데이터를 계산에 사용한다면 켜지 않습니다.
+      - int64: 값 범위가 맞으면 int32
+      - float64: float32 로 바꿔도 값이 같으면 float32
+    """
+    for column in df.columns:
+        series = df[column]
+        if downcast and series.dtype == np.int64:
+            info = np.iinfo(np.int32)
+            if series.empty or (series.min() >= info.min and series.max() <= info.max):
+                df[column] = series.astype(np.int32)
+        elif downcast and series.dtype == np.float64:
+            downcasted = series.astype(np.float32)
+            if ((downcasted == series) | series.isna()).all():
+                df[column] = downcasted
+        elif (
+            series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+        ) and len(series) > 0:
+            if series.nunique(dropna=True) <= len(series) * category_ratio:
+                df[column] = series.astype("category")
+    return df
+
+
+def load_csv(file, cache_dir=DEFAULT_CACHE_DIR, category_ratio=0.5, downcast=False):
+    """CSV 를 DataFrame 으로 로드합니다.
+
+    처음 로드한 파일은 타입을 줄인 뒤 파일 해시를 키로 Parquet 으로 저장하고,
+    같은 파일을 다시 로드하면 CSV 를 파싱하지 않고 Parquet 에서 읽습니다.
+    """
+    cache_path = None
+    if cache_dir is not None:
+        key = f"{file_hash(file)}-v{CACHE_VERSION}-{category_ratio}-{downcast}"
+        cache_path = os.path.join(cache_dir, f"{key}.parquet")
+        if os.path.exists(cache_path):
+            return pd.read_parquet(cache_path)
+
+    df = optimize_dtypes(read_csv(file), category_ratio, downcast)
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            # pyarrow 가 없거나 Parquet 으로 저장할 수 없는 컬럼이 있으면 캐시하지 않습니다.
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return df
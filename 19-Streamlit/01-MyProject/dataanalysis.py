@@ -11,6 +11,9 @@ from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from sandbox import SandboxWorker
+from execution import execute
+from collections import deque
 
 load_dotenv()
 
@@ -23,8 +26,27 @@ class DataAnalysisAgent:
         prefix_prompt: Optional[str] = None,
         postfix_prompt: Optional[str] = None,
         column_guideline: Optional[str] = None,
+        sandbox: bool = True,
+        cpu_seconds: int = 30,
+        memory_mb: int = 2048,
+        timeout: int = 120,
     ):
         self.df = dataframe
+        # sandbox=True 이면 코드를 세션별 별도 프로세스에서 CPU/메모리 제한과 함께 실행합니다.
+        self.sandbox = (
+            SandboxWorker(
+                dataframe,
+                cpu_seconds,
+                memory_mb,
+                timeout,
+                rc_params={
+                    key: plt.rcParams[key]
+                    for key in ("font.family", "axes.unicode_minus")
+                },
+            )
+            if sandbox
+            else None
+        )
         self.model_name = model_name
         self.prefix_prompt = prefix_prompt
         self.postfix_prompt = postfix_prompt
@@ -33,6 +55,8 @@ class DataAnalysisAgent:
             self.column_guideline = COLUMN_GUIDE_PREFIX + column_guideline
         else:
             self.column_guideline = ""
+        # python_repl_tool 의 실행 결과(ExecutionResult)를 실행 순서대로 보관합니다.
+        self.results = deque()
         self.tools = [self.create_python_repl_tool()]
         self.store = {}
         self.setup_agent()
@@ -43,16 +67,22 @@ class DataAnalysisAgent:
             code: Annotated[str, "Any python code(pandas, matplotlib, seaborn) to run"],
         ):
             """Use this tool to run python, pandas query, matplotlib, and seaborn code."""
-            try:
+            if self.sandbox is not None:
+                result = self.sandbox.run(code)
+            else:
                 python_tool = PythonAstREPLTool(
                     locals={"df": self.df, "sns": sns, "plt": plt}
                 )
-                return python_tool.invoke(code)
-            except Exception as e:
-                return f"Execution failed. Error: {repr(e)}"
+                result = execute(python_tool, code)
+            self.results.append(result)
+            return result.text
 
         return python_repl_tool
 
+    def pop_result(self):
+        """가장 먼저 실행된 코드의 ExecutionResult 를 꺼냅니다. (없으면 None)"""
+        return self.results.popleft() if self.results else None
+
     def build_system_prompt(self):
 
         system_prompt = load_prompt("prompts/data-analysis-V02.yaml", encoding="utf-8")
@@ -105,6 +135,8 @@ class DataAnalysisAgent:
         )
 
     def stream(self, input_query, session_id="abc123"):
+        # 이전 질문에서 observation 까지 진행되지 못한 결과가 다음 질문에 섞이지 않도록 비웁니다.
+        self.results.clear()
         agent_with_chat_history = self.get_agent_with_chat_history()
         response = agent_with_chat_history.stream(
             {"input": input_query},
@@ -0,0 +1,100 @@
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+
+# 화면에 표시할 DataFrame 결과의 최대 행 수 (샌드박스 프로세스에서 전달하는 데이터 크기 제한)
+MAX_DATAFRAME_ROWS = 1000
+
+
+@dataclass
+class ExecutionResult:
+    """코드 실행 결과
+
+    - text: 에이전트에 전달할 관찰(observation) 문자열
+    - dataframe: 실행 결과가 DataFrame 이면 상위 MAX_DATAFRAME_ROWS 행
+    - shape: 잘리기 전 DataFrame 의 (행 수, 열 수)
+    - figures: 실행 중 생성된 그림 (PNG bytes)
+    """
+
+    text: str
+    dataframe: Any = None
+    shape: Optional[Tuple[int, int]] = None
+    figures: List[bytes] = field(default_factory=list)
+
+
+def to_observation(result):
+    # tool calling 에이전트가 ToolMessage 를 만들 때와 같은 방식으로 문자열로 변환합니다.
+    if isinstance(result, str):
+        return result
+    try:
+        return json.dumps(result, ensure_ascii=False)
+    except Exception:
+        return str(result)
+
+
+def figure_numbers():
+    """현재 열려 있는 matplotlib 그림 번호를 반환합니다. (코드 실행 전에 기록)"""
+    import matplotlib.pyplot as plt
+
+    return set(plt.get_fignums())
+
+
+def _new_figure_numbers(before=()):
+    import matplotlib.pyplot as plt
+
+    return [num for num in plt.get_fignums() if num not in before]
+
+
+def close_figures(before=()):
+    """before 이후 새로 열린 matplotlib 그림만 닫습니다."""
+    import matplotlib.pyplot as plt
+
+    for num in _new_figure_numbers(before):
+        plt.close(num)
+
+
+def capture_figures(before=()):
+    """before 이후 새로 열린 matplotlib 그림을 PNG bytes 로 저장하고 닫습니다.
+
+    Streamlit 서버처럼 여러 세션이 pyplot 을 함께 쓰는 프로세스에서는 코드 실행 전
+    figure_numbers() 를 before 로 전달하여 다른 세션의 그림을 건드리지 않습니다.
+    """
+    import matplotlib.pyplot as plt
+
+    figures = []
+    for num in _new_figure_numbers(before):
+        buffer = io.BytesIO()
+        plt.figure(num).savefig(buffer, format="png", bbox_inches="tight")
+        figures.append(buffer.getvalue())
+        plt.close(num)
+    return figures
+
+
+def to_execution_result(result, figures_before=()):
+    """실행 결과 값과 실행 중 생성된 그림(figures_before 이후)을 ExecutionResult 로 만듭니다."""
+    if isinstance(result, pd.DataFrame):
+        # 전체 데이터(df 등)를 그대로 반환해도 화면에 표시할 부분만 전달합니다.
+        dataframe, shape = result.head(MAX_DATAFRAME_ROWS), result.shape
+    else:
+        dataframe, shape = None, None
+    return ExecutionResult(
+        text=to_observation(result),
+        dataframe=dataframe,
+        shape=shape,
+        figures=capture_figures(figures_before),
+    )
+
+
+def execute(python_tool, code):
+    """PythonAstREPLTool 로 코드를 한 번 실행하고 결과를 ExecutionResult 로 반환합니다."""
+    figures_before = figure_numbers()
+    try:
+        result = python_tool.invoke(code)
+    except Exception as e:
+        # 실패한 코드가 남긴 그림이 다음 실행 결과에 섞이지 않도록 닫습니다.
+        close_figures(figures_before)
+        return ExecutionResult(f"Execution failed. Error: {repr(e)}")
+    return to_execution_result(result, figures_before)
@@ -10,6 +10,7 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_teddynote import logging
+from embedding_cache import CachedEmbeddings
 from dotenv import load_dotenv
 import os
 
@@ -83,8 +84,8 @@ def embed_file(file):
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=50)
     split_documents = text_splitter.split_documents(docs)
 
-    # 단계 3: 임베딩(Embedding) 생성
-    embeddings = OpenAIEmbeddings()
+    # 단계 3: 임베딩(Embedding) 생성 (이미 임베딩한 청크는 캐시에서 재사용)
+    embeddings = CachedEmbeddings(OpenAIEmbeddings())
 
     # 단계 4: DB 생성(Create DB) 및 저장
     # 벡터스토어를 생성합니다.
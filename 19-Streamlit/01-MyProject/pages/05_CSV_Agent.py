@@ -1,13 +1,13 @@
 from typing import List, Union
 from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
-from langchain_experimental.tools import PythonAstREPLTool
 from langchain_openai import ChatOpenAI
 from langchain_teddynote import logging
 from langchain_teddynote.messages import AgentStreamParser, AgentCallbacks
 from dotenv import load_dotenv
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from execution import close_figures, figure_numbers, to_execution_result
+from csv_loader import load_csv
 
 # API 키 및 프로젝트 설정
 load_dotenv()
@@ -55,7 +55,7 @@ def print_messages():
                     if message_type == MessageType.TEXT:
                         st.markdown(message_content)  # 텍스트 메시지 출력
                     elif message_type == MessageType.FIGURE:
-                        st.pyplot(message_content)  # 그림 메시지 출력
+                        st.image(message_content)  # 그림 메시지 출력 (PNG bytes)
                     elif message_type == MessageType.CODE:
                         with st.status("코드 출력", expanded=False):
                             st.code(
@@ -104,33 +104,15 @@ def tool_callback(tool) -> None:
     """
     if tool_name := tool.get("tool"):
         if tool_name == "python_repl_ast":
+            # 코드 실행 전에 열려 있던 그림(다른 세션의 그림 포함)은 결과에 포함하지 않습니다.
+            st.session_state["figures_before"] = figure_numbers()
             tool_input = tool.get("tool_input", {})
             query = tool_input.get("query")
             if query:
-                df_in_result = None
-                with st.status("데이터 분석 중...", expanded=True) as status:
+                # 코드는 에이전트가 도구를 실행할 때 한 번만 실행되고, 결과는 observation_callback 에서 표시합니다.
+                with st.status("코드 출력", expanded=False):
                     st.markdown(f"```python\n{query}\n```")
-                    add_message(MessageRole.ASSISTANT, [MessageType.CODE, query])
-                    if "df" in st.session_state:
-                        result = st.session_state["python_tool"].invoke(
-                            {"query": query}
-                        )
-                        if isinstance(result, pd.DataFrame):
-                            df_in_result = result
-                    status.update(label="코드 출력", state="complete", expanded=False)
-
-                if df_in_result is not None:
-                    st.dataframe(df_in_result)
-                    add_message(
-                        MessageRole.ASSISTANT, [MessageType.DATAFRAME, df_in_result]
-                    )
-
-                if "plt.show" in query:
-                    fig = plt.gcf()
-                    st.pyplot(fig)
-                    add_message(MessageRole.ASSISTANT, [MessageType.FIGURE, fig])
-
-                return result
+                add_message(MessageRole.ASSISTANT, [MessageType.CODE, query])
             else:
                 st.error(
                     "데이터프레임이 정의되지 않았습니다. CSV 파일을 먼저 업로드해주세요."
@@ -147,11 +129,30 @@ def observation_callback(observation) -> None:
     """
     if "observation" in observation:
         obs = observation["observation"]
+        figures_before = st.session_state.pop("figures_before", set())
         if isinstance(obs, str) and "Error" in obs:
             st.error(obs)
             st.session_state["messages"][-1][
                 1
             ].clear()  # 에러 발생 시 마지막 메시지 삭제
+            close_figures(figures_before)
+            return
+
+        # python_repl_ast 도구의 관찰 결과는 실행 결과 값 그대로이며, 그림은 실행 직후 한 번만 수집합니다.
+        result = to_execution_result(obs, figures_before)
+        if result.dataframe is not None:
+            st.dataframe(result.dataframe)
+            if result.shape[0] > len(result.dataframe):
+                st.caption(
+                    f"전체 {result.shape[0]}행 x {result.shape[1]}열 중 상위 {len(result.dataframe)}행만 표시합니다."
+                )
+            add_message(
+                MessageRole.ASSISTANT, [MessageType.DATAFRAME, result.dataframe]
+            )
+
+        for figure in result.figures:
+            st.image(figure)
+            add_message(MessageRole.ASSISTANT, [MessageType.FIGURE, figure])
 
 
 def result_callback(result: str) -> None:
@@ -233,12 +234,13 @@ if clear_btn:
     st.session_state["messa ges"] = []  # 대화 내용 초기화
 
 if apply_btn and uploaded_file:
-    loaded_data = pd.read_csv(uploaded_file)  # CSV 파일 로드
+    with st.spinner("CSV 파일을 불러오는 중입니다..."):
+        # CSV 파일 로드 (같은 파일은 Parquet 캐시 사용, 여러 파일은 하나로 합침)
+        frames = [load_csv(file) for file in uploaded_file]
+        loaded_data = (
+            frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        )
     st.session_state["df"] = loaded_data  # 데이터프레임 저장
-    st.session_state["python_tool"] = PythonAstREPLTool()  # Python 실행 도구 생성
-    st.session_state["python_tool"].locals[
-        "df"
-    ] = loaded_data  # 데이터프레임을 Python 실행 환경에 추가
     st.session_state["agent"] = create_agent(
         loaded_data, selected_model
     )  # 에이전트 생성
@@ -2,6 +2,7 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PDFPlumberLoader
 from langchain_community.vectorstores import FAISS
 from langchain_openai import OpenAIEmbeddings
+from embedding_cache import CachedEmbeddings
 
 
 def create_retriever(file_path):
@@ -13,8 +14,8 @@ def create_retriever(file_path):
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=50)
     split_documents = text_splitter.split_documents(docs)
 
-    # 단계 3: 임베딩(Embedding) 생성
-    embeddings = OpenAIEmbeddings()
+    # 단계 3: 임베딩(Embedding) 생성 (이미 임베딩한 청크는 캐시에서 재사용)
+    embeddings = CachedEmbeddings(OpenAIEmbeddings())
 
     # 단계 4: DB 생성(Create DB) 및 저장
     # 벡터스토어를 생성합니다.
@@ -0,0 +1,175 @@
+import multiprocessing as mp
+import threading
+import weakref
+
+from execution import ExecutionResult, execute
+
+try:
+    import resource
+    import signal
+except ImportError:
+    # Windows 에는 resource 모듈이 없으므로 시간 제한(timeout)만 적용됩니다.
+    resource = None
+
+
+class CPUTimeExceeded(Exception):
+    """코드 실행이 CPU 시간 제한을 초과했습니다."""
+
+
+def _on_cpu_limit(signum, frame):
+    raise CPUTimeExceeded("CPU 시간 제한을 초과했습니다.")
+
+
+def _vm_size_mb():
+    """현재 프로세스의 가상 메모리 크기(MB)를 반환합니다. (Linux)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _set_cpu_limit(cpu_seconds):
+    # RLIMIT_CPU 는 프로세스 누적 시간이므로, 호출마다 현재 사용량 + cpu_seconds 로 설정합니다.
+    # (cpu_seconds 가 None 이면 제한을 해제합니다)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if cpu_seconds is None:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, hard))
+
+
+def _worker_main(conn, dataframe, cpu_seconds, memory_mb, rc_params):
+    """샌드박스 프로세스: DataFrame 과 인터프리터 상태를 유지하며 코드를 실행합니다."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+    from langchain_experimental.tools.python.tool import PythonAstREPLTool
+
+    # 한글 폰트 등 부모 프로세스의 matplotlib 설정을 적용합니다.
+    plt.rcParams.update(rc_params or {})
+    python_tool = PythonAstREPLTool(
+        locals={"df": dataframe, "sns": sns, "plt": plt, "pd": pd}
+    )
+
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+        if memory_mb:
+            # RSS 는 직접 제한할 수 없으므로 라이브러리 로드 후 주소 공간(RLIMIT_AS)으로 제한합니다.
+            limit = (_vm_size_mb() + memory_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "close":
+            break
+        _, code = message
+        limit_cpu = resource is not None and cpu_seconds
+        try:
+            if limit_cpu:
+                _set_cpu_limit(cpu_seconds)
+            result = execute(python_tool, code)
+        except (CPUTimeExceeded, MemoryError) as e:
+            result = ExecutionResult(f"Execution failed. Error: {repr(e)}")
+        finally:
+            # 제한을 넘긴 뒤에는 SIGXCPU 가 반복되므로 다음 호출까지 제한을 해제합니다.
+            if limit_cpu:
+                _set_cpu_limit(None)
+        # 실행 결과(text, DataFrame, 그림)를 한 번에 전달하므로 UI 에서 다시 실행할 필요가 없습니다.
+        conn.send(result)
+
+
+def _shutdown(process, conn):
+    try:
+        conn.send(("close",))
+    except (OSError, ValueError):
+        pass
+    process.join(timeout=1)
+    if process.is_alive():
+        process.kill()
+    conn.close()
+
+
+class SandboxWorker:
+    """에이전트가 생성한 파이썬 코드를 별도 프로세스에서 실행합니다.
+
+    - DataFrame 은 프로세스 시작 시 한 번만 전달되고, 변수 등 인터프리터 상태는 호출 간 유지됩니다.
+    - cpu_seconds: 호출당 CPU 시간 제한 (초과 시 해당 호출만 실패)
+    - memory_mb: 라이브러리 로드 후 추가로 사용할 수 있는 메모리 (초과 시 MemoryError)
+    - timeout: 호출당 대기 시간 제한 (초과 시 프로세스를 재시작하며 상태가 초기화됩니다)
+    - rc_params: 그림 생성 시 적용할 matplotlib 설정 (예: 한글 폰트)
+    """
+
+    def __init__(
+        self, dataframe, cpu_seconds=30, memory_mb=2048, timeout=120, rc_params=None
+    ):
+        self.dataframe = dataframe
+        self.rc_params = rc_params
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+
+    def start(self):
+        context = mp.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.dataframe,
+                self.cpu_seconds,
+                self.memory_mb,
+                self.rc_params,
+            ),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        # 세션이 끝나 객체가 사라지면 프로세스도 종료합니다.
+        self._finalizer = weakref.finalize(self, _shutdown, self.process, self.conn)
+
+    def close(self):
+        if self.process is not None:
+            self._finalizer()
+            self.process = None
+
+    def restart(self):
+        if self.process is not None:
+            self.process.kill()
+        self.close()
+        self.start()
+
+    def run(self, code: str) -> ExecutionResult:
+        """코드를 실행하고 결과를 ExecutionResult 로 반환합니다."""
+        with self.lock:
+            if self.process is None or not self.process.is_alive():
+                self.restart()
+            self.conn.send(("run", code))
+            # 첫 호출은 프로세스 시작(라이브러리 로드) 시간을 포함합니다.
+            if not self.conn.poll(self.timeout):
+                self.restart()
+                return ExecutionResult(
+                    f"Execution failed. Error: TimeoutError('{self.timeout}초 안에 실행이 끝나지 않았습니다.')"
+                )
+            try:
+                return self.conn.recv()
+            except EOFError:
+                # 메모리 초과 등으로 프로세스가 종료된 경우
+                self.restart()
+                return ExecutionResult(
+                    "Execution failed. Error: 실행 프로세스가 비정상 종료되었습니다."
+                )
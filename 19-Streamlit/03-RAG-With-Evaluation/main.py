@@ -1,6 +1,7 @@
 import streamlit as st
 from langchain_core.messages.chat import ChatMessage
 from rag.pdf import PDFRetrievalChain
+from rag.cache import file_hash
 from langchain_teddynote import logging
 from rag.evaluation import RagEvaluator
 from dotenv import load_dotenv
@@ -36,8 +37,12 @@ if "chain" not in st.session_state:
     st.session_state["chain"] = None
 
 if "evaluator" not in st.session_state:
-    # RAGAS 평가를 위한 객체 생성
-    st.session_state["evaluator"] = RagEvaluator()
+    # RAGAS 평가를 위한 객체 생성 (답변 후 평가는 백그라운드에서 실행)
+    st.session_state["evaluator"] = RagEvaluator(background=True)
+
+if "eval_futures" not in st.session_state:
+    # 메시지 번호 → 평가 결과(Future)
+    st.session_state["eval_futures"] = {}
 
 # 사이드바 생성
 with st.sidebar:
@@ -49,6 +54,13 @@ with st.sidebar:
 
     eval_toggle = st.toggle("평가 결과 출력", value=True)
 
+    # 로컬 지표(LLM 호출 없음)로 표시된 답변만 LLM 으로 평가합니다.
+    prescreen_toggle = st.toggle("로컬 지표로 선별 평가", value=True)
+    st.session_state["evaluator"].prescreen = prescreen_toggle
+
+    # 백그라운드 평가가 끝난 결과를 화면에 반영합니다.
+    st.button("평가 결과 새로고침", use_container_width=True)
+
     st.subheader("전체 평가")
     eval_all_btn = st.button(
         "결과 출력", key="eval_all", type="primary", use_container_width=True
@@ -59,21 +71,64 @@ with st.sidebar:
         evaluator = st.session_state["evaluator"]
         if len(evaluator.get_samples()["question"]) > 0:
             with st.spinner("평가 중입니다. 잠시만 기다려 주세요"):
-                eval_df = evaluator.evaluate_all()
-                result_df = eval_df[["faithfulness", "answer_relevancy"]].mean()
-                result_df.name = "평균 점수"
+                eval_df = evaluator.evaluate_all(prescreen=prescreen_toggle)
+                # 선별 평가이면 LLM 점수는 로컬 지표로 표시된 샘플에만 있습니다.
+                judged = (
+                    eval_df["flagged"].to_numpy() if prescreen_toggle else slice(None)
+                )
+                judged_df = eval_df.loc[judged, ["faithfulness", "answer_relevancy"]]
+                st.caption(f"LLM 평가 샘플: {len(judged_df)}/{len(eval_df)}개")
+                if len(judged_df) > 0:
+                    result_df = judged_df.mean()
+                    result_df.name = (
+                        "평균 점수 (LLM 평가 샘플)" if prescreen_toggle else "평균 점수"
+                    )
+                    st.dataframe(
+                        result_df,
+                        use_container_width=True,
+                    )
+                else:
+                    st.info(
+                        "로컬 지표 기준으로 모든 샘플이 통과하여 LLM 평가를 생략했습니다."
+                    )
+                # LLM 호출 없이 계산하는 로컬 지표
+                local_df = eval_df if prescreen_toggle else evaluator.evaluate_local()
+                local_mean = local_df.reindex(columns=list(evaluator.thresholds)).mean()
+                local_mean.name = "로컬 지표 평균 (전체 샘플)"
                 st.dataframe(
-                    result_df,
+                    local_mean,
                     use_container_width=True,
                 )
+                st.caption(
+                    f"로컬 지표 기준 점검 필요 샘플: {local_df['flagged'].sum()}개"
+                    + (" (LLM 평가는 이 샘플만 실행)" if prescreen_toggle else "")
+                )
         else:
             st.error("평가할 데이터가 없습니다.")
 
 
+# 평가 결과를 답변 아래에 붙일 텍스트로 변환
+def format_evaluation(future):
+    if future is None:
+        return "\n\n⚠️ 평가 대기열이 가득 차서 평가하지 않았습니다."
+    if not future.done():
+        return "\n\n⏳ 평가 중입니다..."
+    if future.cancelled() or future.exception() is not None:
+        return "\n\n⚠️ 평가에 실패했습니다."
+    scores = future.result()
+    if "flagged" in scores and not scores["flagged"]:
+        return "\n\n✅ 로컬 지표 기준 통과 (LLM 평가 생략)"
+    return f'\n\n✅ 평가 결과\n- 관련성 점수: {scores["answer_relevancy"]:.3f}\n- 신뢰도 점수: {scores["faithfulness"]:.3f}'
+
+
 # 이전 대화를 출력
 def print_messages():
-    for chat_message in st.session_state["messages"]:
-        st.chat_message(chat_message.role).write(chat_message.content)
+    eval_futures = st.session_state["eval_futures"]
+    for i, chat_message in enumerate(st.session_state["messages"]):
+        content = chat_message.content
+        if i in eval_futures:
+            content += format_evaluation(eval_futures[i])
+        st.chat_message(chat_message.role).write(content)
 
 
 # 새로운 메시지를 추가
@@ -92,15 +147,13 @@ def embed_file(file):
     return file_path
 
 
-# 체인 생성
-def create_rag_chain(file_path):
+# 체인 생성 (파일 경로와 내용 해시가 같으면 다시 만들지 않아 질문 캐시가 화면 갱신 사이에 유지됩니다)
+@st.cache_resource(show_spinner="RAG 체인을 생성 중입니다...")
+def create_rag_chain(file_path, content_hash):
     # PDF 문서를 로드
-    pdf = PDFRetrievalChain([file_path]).create_chain()
-
-    # retriever 와 chain을 생성
-    pdf_retriever = pdf.retriever
-    pdf_chain = pdf.chain
-    return pdf_retriever, pdf_chain
+    return PDFRetrievalChain(
+        [file_path], cache_dir=".cache/embeddings", query_cache=True
+    ).create_chain()
 
 
 # 파일이 업로드 되었을 때
@@ -108,14 +161,21 @@ if uploaded_file:
     # 파일 임베딩
     file_path = embed_file(uploaded_file)
     # RAG 체인 생성
-    retriever, chain = create_rag_chain(file_path)
-    st.session_state["retriever"] = retriever
-    st.session_state["chain"] = chain
+    pdf = create_rag_chain(file_path, file_hash(file_path))
+    st.session_state["retriever"] = pdf.retriever
+    st.session_state["chain"] = pdf.chain
+    # 로컬 평가 지표에 문서 임베딩(캐시)을 재사용합니다.
+    st.session_state["evaluator"].embeddings = pdf.vectorstore.embeddings
 
 # 초기화 버튼이 눌리면...
 if clear_btn:
     st.session_state["messages"] = []
-    st.session_state["evaluator"] = RagEvaluator()
+    st.session_state["evaluator"].shutdown()
+    embeddings = st.session_state["evaluator"].embeddings
+    st.session_state["evaluator"] = RagEvaluator(
+        background=True, embeddings=embeddings, prescreen=prescreen_toggle
+    )
+    st.session_state["eval_futures"] = {}
 
 # 이전 대화 기록 출력
 print_messages()
@@ -152,17 +212,21 @@ if user_input:
                 ai_answer += token
                 container.markdown(ai_answer)
 
-            # RAGAS 평가를 위한 결과 저장
-            evaluator.add_sample(user_input, ai_answer, context)
+            # RAGAS 평가를 위한 결과 저장 (평가는 백그라운드 큐에서 실행)
+            future = evaluator.add_sample(
+                user_input, ai_answer, context, evaluate=eval_toggle
+            )
             if eval_toggle:
-                with st.spinner("평가 중입니다. 잠시만 기다려 주세요"):
-                    evaluate_last = evaluator.evaluate_last()
-                ai_answer += f'\n\n✅ 평가 결과\n- 관련성 점수: {evaluate_last.iloc[0]["answer_relevancy"]:.3f}\n- 신뢰도 점수: {evaluate_last.iloc[0]["faithfulness"]:.3f}'
-                container.markdown(ai_answer)
+                container.markdown(ai_answer + format_evaluation(future))
 
         # 대화기록을 저장한다.
         add_message("user", user_input)
         add_message("assistant", ai_answer)
+        if eval_toggle:
+            # 평가가 끝나면 다음 화면 갱신 때 답변 아래에 점수가 표시됩니다.
+            st.session_state["eval_futures"][
+                len(st.session_state["messages"]) - 1
+            ] = future
     else:
         # 파일을 업로드 하라는 경고 메시지 출력
         warning_msg.error("파일을 업로드 해주세요.")
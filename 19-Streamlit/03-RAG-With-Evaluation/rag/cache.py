@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import pickle
+
+from langchain_community.vectorstores import FAISS
+
+from rag.embedding_cache import embedding_namespace
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """파일 내용의 sha256 해시를 반환합니다."""
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def embedding_model_name(embeddings):
+    """캐시 키에 사용할 임베딩 모델 이름을 반환합니다. (API 주소, 차원 수 포함)"""
+    return embedding_namespace(embeddings)
+
+
+def splitter_params(text_splitter):
+    """캐시 키에 사용할 text splitter 설정을 반환합니다.
+
+    같은 결과를 내는 splitter(FastRecursiveCharacterTextSplitter 등)는 cache_type 으로
+    같은 키를 사용하여 기존 캐시를 그대로 사용합니다.
+    """
+    params = {
+        "type": getattr(text_splitter, "cache_type", type(text_splitter).__name__),
+        "chunk_size": getattr(text_splitter, "_chunk_size", None),
+        "chunk_overlap": getattr(text_splitter, "_chunk_overlap", None),
+        "separators": getattr(text_splitter, "_separators", None),
+    }
+    # 청크 metadata 가 달라지므로 add_start_index 를 사용할 때만 키에 포함합니다.
+    if getattr(text_splitter, "_add_start_index", False):
+        params["add_start_index"] = True
+    return params
+
+
+def _payload_hash(payload):
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def index_cache_key(source_uris, text_splitter, embeddings, index_params=None):
+    """파일 내용, 분할 설정, 임베딩 모델, 인덱스 설정으로부터 인덱스 캐시 키를 생성합니다."""
+    payload = {
+        "files": [file_hash(source_uri) for source_uri in source_uris],
+        "splitter": splitter_params(text_splitter),
+        "embedding": embedding_model_name(embeddings),
+    }
+    # 기본(flat) 인덱스는 기존 캐시 키를 그대로 유지합니다.
+    if index_params:
+        payload["index"] = index_params
+    return _payload_hash(payload)
+
+
+def index_settings_key(text_splitter, embeddings):
+    """파일 내용을 제외한 분할 설정, 임베딩 모델로부터 인덱스 키를 생성합니다."""
+    return _payload_hash(
+        {
+            "splitter": splitter_params(text_splitter),
+            "embedding": embedding_model_name(embeddings),
+        }
+    )
+
+
+def has_faiss_index(index_path, index_name="index"):
+    return os.path.exists(
+        os.path.join(index_path, f"{index_name}.faiss")
+    ) and os.path.exists(os.path.join(index_path, f"{index_name}.pkl"))
+
+
+def save_faiss_index(vectorstore, index_path, index_name="index"):
+    """FAISS 인덱스와 docstore 를 디스크에 저장합니다."""
+    # 저장 도중 종료되어도 깨진 캐시가 남지 않도록 임시 폴더에 저장 후 교체합니다.
+    tmp_path = f"{index_path}.tmp-{os.getpid()}"
+    vectorstore.save_local(tmp_path, index_name=index_name)
+    os.makedirs(index_path, exist_ok=True)
+    for ext in ("faiss", "pkl"):
+        os.replace(
+            os.path.join(tmp_path, f"{index_name}.{ext}"),
+            os.path.join(index_path, f"{index_name}.{ext}"),
+        )
+    os.rmdir(tmp_path)
+
+
+def load_faiss_index(index_path, embeddings, index_name="index", mmap=False):
+    """저장된 FAISS 인덱스를 로드합니다.
+
+    mmap=True 이면 IVF 계열 인덱스의 벡터 목록을 메모리 매핑(read-only)하여 즉시 로드합니다.
+    - 읽기 전용이므로 로드한 IVF 인덱스에는 문서를 추가/삭제할 수 없습니다. (RuntimeError)
+    - flat, HNSW 인덱스는 메모리 매핑되지 않고 일반 로드와 같습니다.
+    """
+    import faiss
+
+    index_file = os.path.join(index_path, f"{index_name}.faiss")
+    index = None
+    if mmap:
+        try:
+            index = faiss.read_index(
+                index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+        except RuntimeError:
+            # 메모리 매핑을 지원하지 않는 인덱스 타입은 일반 로드로 대체합니다.
+            index = None
+    if index is None:
+        index = faiss.read_index(index_file)
+
+    with open(os.path.join(index_path, f"{index_name}.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
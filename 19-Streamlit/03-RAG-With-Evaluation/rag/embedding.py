@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_community.vectorstores import FAISS
+
+from rag.utils import count_tokens
+
+
+def run_sync(coro):
+    """이미 이벤트 루프가 실행 중인 환경(Jupyter 등)에서도 코루틴을 실행합니다."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def batch_by_tokens(texts, max_tokens_per_batch=50_000, max_batch_size=1_000):
+    """토큰 예산을 넘지 않도록 텍스트 인덱스를 배치로 묶습니다."""
+    batches, batch, batch_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        n_tokens = count_tokens(text)
+        if batch and (
+            batch_tokens + n_tokens > max_tokens_per_batch
+            or len(batch) >= max_batch_size
+        ):
+            batches.append((batch, batch_tokens))
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += n_tokens
+    if batch:
+        batches.append((batch, batch_tokens))
+    return batches
+
+
+class TokenRateLimiter:
+    """분당 토큰 수(TPM) 제한을 지키는 토큰 버킷입니다."""
+
+    def __init__(self, tokens_per_minute):
+        self.capacity = tokens_per_minute
+        self.tokens = tokens_per_minute
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.capacity / 60,
+        )
+        self.updated_at = now
+
+    async def acquire(self, tokens):
+        # 한 배치가 버킷보다 크면 버킷이 가득 찰 때까지만 기다립니다.
+        tokens = min(tokens, self.capacity)
+        async with self.lock:
+            self._refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) * 60 / self.capacity)
+                self._refill()
+            self.tokens -= tokens
+
+
+class BatchEmbeddingPipeline:
+    """청크를 토큰 예산 단위로 묶어 동시에 임베딩하고, 완료되는 대로 FAISS 에 추가합니다.
+
+    Args:
+        embeddings: aembed_documents 를 지원하는 LangChain Embeddings
+        max_tokens_per_batch: 요청 1회에 포함할 최대 토큰 수
+        max_concurrency: 동시에 보낼 최대 요청 수
+        tokens_per_minute: 분당 토큰 제한 (None 이면 제한하지 않음)
+        max_retries: 요청 실패 시 최대 재시도 횟수
+        backoff: 재시도 대기 시간(초)의 기준값 (지수적으로 증가)
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        max_tokens_per_batch=50_000,
+        max_concurrency=8,
+        tokens_per_minute=1_000_000,
+        max_retries=5,
+        backoff=1.0,
+    ):
+        self.embeddings = embeddings
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    async def _embed_batch(self, texts, n_tokens, semaphore, rate_limiter):
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter is not None:
+                await rate_limiter.acquire(n_tokens)
+            async with semaphore:
+                try:
+                    return await self.embeddings.aembed_documents(texts)
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+            # 지수 백오프 + jitter
+            await asyncio.sleep(self.backoff * 2**attempt * (1 + random.random()))
+
+    async def astream(self, docs):
+        """(Document 배치, 벡터 배치) 를 임베딩이 끝나는 순서대로 반환합니다."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        rate_limiter = (
+            TokenRateLimiter(self.tokens_per_minute) if self.tokens_per_minute else None
+        )
+        texts = [doc.page_content for doc in docs]
+
+        async def run(indices, n_tokens):
+            batch_docs = [docs[i] for i in indices]
+            vectors = await self._embed_batch(
+                [texts[i] for i in indices], n_tokens, semaphore, rate_limiter
+            )
+            return batch_docs, vectors
+
+        tasks = [
+            asyncio.create_task(run(indices, n_tokens))
+            for indices, n_tokens in batch_by_tokens(texts, self.max_tokens_per_batch)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def abuild_faiss(self, docs):
+        vectorstore = None
+        async for batch_docs, vectors in self.astream(docs):
+            text_embeddings = [
+                (doc.page_content, vector) for doc, vector in zip(batch_docs, vectors)
+            ]
+            metadatas = [doc.metadata for doc in batch_docs]
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(
+                    text_embeddings, self.embeddings, metadatas=metadatas
+                )
+            else:
+                vectorstore.add_embeddings(text_embeddings, metadatas=metadatas)
+        return vectorstore
+
+    async def aembed_all(self, docs):
+        """모든 문서를 임베딩하여 문서 순서대로 벡터 목록을 반환합니다."""
+        positions = {id(doc): i for i, doc in enumerate(docs)}
+        vectors = [None] * len(docs)
+        async for batch_docs, batch_vectors in self.astream(docs):
+            for doc, vector in zip(batch_docs, batch_vectors):
+                vectors[positions[id(doc)]] = vector
+        return vectors
+
+    def embed_all(self, docs):
+        return run_sync(self.aembed_all(docs))
+
+    def build_faiss(self, docs):
+        """문서를 임베딩하여 FAISS 벡터스토어를 생성합니다."""
+        return run_sync(self.abuild_faiss(docs))
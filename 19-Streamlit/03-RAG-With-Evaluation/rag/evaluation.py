@@ -1,23 +1,272 @@
+import copy
+import hashlib
+import math
+import queue
+import re
+import threading
+import weakref
+from collections import defaultdict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
 from datasets import Dataset
 from langchain_core.documents import Document
+from rag.embedding_cache import embed_transient
 from ragas.metrics import answer_relevancy, faithfulness
 from ragas import evaluate
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+
+def contexts_hash(contexts: List[str]) -> str:
+    """context 목록의 해시를 반환합니다."""
+    return hashlib.sha256("\x1e".join(contexts).encode("utf-8")).hexdigest()
+
+
+def sample_key(question: str, answer: str, contexts: List[str]) -> Tuple:
+    """점수 캐시에 사용할 샘플 키 (질문, 답변, context 해시)"""
+    return (question, answer, contexts_hash(contexts))
+
+
+# 로컬 지표의 임계값: 하나라도 미달하면 LLM 평가가 필요한 샘플로 표시합니다.
+LOCAL_THRESHOLDS = {
+    "embedding_relevancy": 0.35,
+    "context_similarity": 0.4,
+    "lexical_groundedness": 0.5,
+    "context_utilization": 0.1,
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def char_bigrams(text: str) -> set:
+    """단어별 글자 bigram 집합 (조사/어미가 붙는 한국어도 부분 일치로 비교할 수 있습니다)"""
+    grams = set()
+    for word in _WORD.findall(text.lower()):
+        if len(word) == 1:
+            grams.add(word)
+        else:
+            grams.update(word[i : i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+def lexical_metrics(answers, contexts, min_context_overlap=0.1):
+    """모든 샘플의 어휘 기반 지표를 한 번에 계산합니다.
+
+    - lexical_groundedness: 답변 bigram 중 context 에 있는 비율
+    - context_utilization: 답변 bigram 의 min_context_overlap 이상을 포함하는 context 비율
+
+    (샘플 번호 * 어휘 수 + 토큰 번호) 키 배열에 np.isin 을 적용하여 샘플 전체를 벡터 연산합니다.
+    """
+    vocab = {}
+
+    def token_ids(text):
+        return [vocab.setdefault(gram, len(vocab)) for gram in char_bigrams(text)]
+
+    answer_tokens = [token_ids(answer) for answer in answers]
+    context_tokens = [token_ids(c) for sample in contexts for c in sample]
+    n_samples = len(answers)
+    n_contexts = np.array([len(sample) for sample in contexts])
+    vocab_size = max(len(vocab), 1)
+
+    answer_sample = np.repeat(np.arange(n_samples), [len(t) for t in answer_tokens])
+    answer_keys = answer_sample * vocab_size + np.fromiter(
+        (i for t in answer_tokens for i in t), dtype=np.int64
+    )
+    context_sample = np.repeat(np.arange(n_samples), n_contexts)
+    token_context = np.repeat(
+        np.arange(len(context_tokens)), [len(t) for t in context_tokens]
+    )
+    context_keys = context_sample[token_context] * vocab_size + np.fromiter(
+        (i for t in context_tokens for i in t), dtype=np.int64
+    )
+
+    answer_len = np.bincount(answer_sample, minlength=n_samples)
+    answer_hits = np.bincount(
+        answer_sample,
+        weights=np.isin(answer_keys, context_keys),
+        minlength=n_samples,
+    )
+    context_hits = np.bincount(
+        token_context,
+        weights=np.isin(context_keys, answer_keys),
+        minlength=len(context_tokens),
+    )
+    used = context_hits / np.maximum(answer_len[context_sample], 1) >= (
+        min_context_overlap
+    )
+    used_contexts = np.bincount(context_sample, weights=used, minlength=n_samples)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "lexical_groundedness": np.where(
+                answer_len > 0, answer_hits / answer_len, np.nan
+            ),
+            "context_utilization": np.where(
+                n_contexts > 0, used_contexts / n_contexts, np.nan
+            ),
+        }
+
+
+def embedding_metrics(questions, answers, contexts, embeddings):
+    """임베딩 코사인 유사도 지표를 계산합니다.
+
+    - embedding_relevancy: 질문과 답변의 유사도
+    - context_similarity: 답변과 가장 가까운 context 의 유사도
+
+    embeddings 가 CachedEmbeddings 이면 이미 인덱싱한 context 청크는 캐시에서 가져오고,
+    질문/답변 등 새로 임베딩한 텍스트는 디스크 캐시에 저장하지 않습니다.
+    """
+    texts = list(
+        dict.fromkeys([*questions, *answers, *(c for s in contexts for c in s)])
+    )
+    vectors = np.asarray(embed_transient(embeddings, texts), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    index = {text: i for i, text in enumerate(texts)}
+
+    question_vectors = vectors[[index[q] for q in questions]]
+    answer_vectors = vectors[[index[a] for a in answers]]
+    n_contexts = np.array([len(sample) for sample in contexts])
+    context_sample = np.repeat(np.arange(len(answers)), n_contexts)
+    context_vectors = vectors[[index[c] for s in contexts for c in s]].reshape(
+        -1, vectors.shape[1]
+    )
+
+    similarity = np.full(len(answers), -np.inf)
+    np.maximum.at(
+        similarity,
+        context_sample,
+        (answer_vectors[context_sample] * context_vectors).sum(axis=1),
+    )
+    return {
+        "embedding_relevancy": (question_vectors * answer_vectors).sum(axis=1),
+        "context_similarity": np.where(n_contexts > 0, similarity, np.nan),
+    }
+
+
+def local_metrics(questions, answers, contexts, embeddings=None, thresholds=None):
+    """LLM 없이 계산하는 지표와 LLM 평가가 필요한지(flagged)를 DataFrame 으로 반환합니다."""
+    thresholds = thresholds or LOCAL_THRESHOLDS
+    metrics = lexical_metrics(answers, contexts)
+    if embeddings is not None:
+        metrics.update(embedding_metrics(questions, answers, contexts, embeddings))
+    df = pd.DataFrame(metrics)
+    # 임계값 미달 지표가 하나라도 있으면 표시합니다. (계산하지 못한 지표는 제외)
+    flagged = np.zeros(len(df), dtype=bool)
+    for name, threshold in thresholds.items():
+        if name in df:
+            flagged |= (df[name] < threshold).to_numpy()
+    df["flagged"] = flagged
+    return df
+
+
+class EvaluationWorker:
+    """샘플 평가를 백그라운드 스레드에서 실행합니다.
+
+    큐 크기(max_queue_size)와 동시에 평가하는 샘플 수(max_workers)를 제한합니다.
+    evaluator 는 약한 참조로 유지하므로, evaluator 가 사라지면 스레드도 종료됩니다.
+    """
+
+    def __init__(self, evaluator, max_queue_size=32, max_workers=2):
+        self.evaluator = weakref.ref(evaluator)
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.stopped = threading.Event()
+        self.threads = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(max_workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, index: int) -> Optional[Future]:
+        """index 샘플의 평가를 큐에 넣습니다. (큐가 가득 차면 None 반환)"""
+        future = Future()
+        try:
+            self.queue.put_nowait((index, future))
+        except queue.Full:
+            return None
+        return future
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                index, future = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if not self._evaluate(index, future):
+                break
+
+    def _evaluate(self, index, future):
+        # evaluator 참조를 이 함수 안에서만 유지해야 대기 중에 evaluator 가 해제될 수 있습니다.
+        evaluator = self.evaluator()
+        if evaluator is None:
+            future.cancel()
+            return False
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(evaluator.evaluate_sample(index))
+            except Exception as e:
+                future.set_exception(e)
+        return True
+
+    def shutdown(self):
+        """워커를 종료하고 대기 중인 평가를 취소합니다."""
+        self.stopped.set()
+        while True:
+            try:
+                _, future = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
 
 
 class RagEvaluator:
-    def __init__(self):
+    def __init__(
+        self,
+        metrics=None,
+        background=False,
+        max_queue_size=32,
+        max_workers=2,
+        embeddings=None,
+        thresholds=None,
+        prescreen=False,
+    ):
         # 데이터 저장을 위한 리스트 초기화
         self.questions: List[str] = []
         self.answers: List[str] = []
         self.contexts: List[List[Document]] = []
+        self.metrics = metrics or [answer_relevancy, faithfulness]
+        # (샘플 키, 지표 이름) → 점수
+        self.score_cache: Dict[Tuple, float] = {}
+        # 로컬 지표 계산에 사용할 임베딩 (None 이면 어휘 기반 지표만 계산)
+        self.embeddings = embeddings
+        self.thresholds = thresholds or LOCAL_THRESHOLDS
+        # prescreen=True 이면 로컬 지표로 표시된(flagged) 샘플만 LLM 으로 평가합니다.
+        self.prescreen = prescreen
+        # background=True 이면 add_sample 시 평가를 백그라운드 큐에 넣습니다.
+        self.worker = None
+        if background:
+            self._start_worker(max_queue_size, max_workers)
+
+    def _start_worker(self, max_queue_size, max_workers):
+        self.worker = EvaluationWorker(self, max_queue_size, max_workers)
+        # 세션이 끝나 evaluator 가 사라지면 워커 스레드도 종료합니다.
+        self._finalizer = weakref.finalize(self, self.worker.shutdown)
+
+    def add_sample(
+        self, question: str, answer: str, context: List[Document], evaluate=True
+    ) -> Optional[Future]:
+        """평가할 데이터 샘플을 추가합니다.
 
-    def add_sample(self, question: str, answer: str, context: List[Document]):
-        """평가할 데이터 샘플을 추가합니다."""
+        background 모드이고 evaluate=True 이면 평가를 큐에 넣고, 지표별 점수(Series)를
+        결과로 갖는 Future 를 반환합니다. (큐가 가득 차면 None)
+        """
         self.questions.append(question)
         self.answers.append(answer)
         context_list = [doc.page_content for doc in context]
         self.contexts.append(context_list)
+        if self.worker is not None and evaluate:
+            return self.worker.submit(len(self.questions) - 1)
+        return None
 
     def get_samples(self) -> Dict:
         """현재까지 저장된 모든 샘플을 딕셔너리 형태로 반환합니다."""
@@ -27,20 +276,135 @@ class RagEvaluator:
             "contexts": self.contexts,
         }
 
-    def evaluate_all(self):
-        """저장된 데이터에 대해 RAG 평가를 수행합니다."""
+    def score_samples(self, indices: List[int]) -> pd.DataFrame:
+        """indices 샘플의 점수를 반환합니다.
+
+        이미 평가한 (샘플, 지표)는 캐시된 점수를 사용하고, 나머지만 ragas 로 평가합니다.
+        같은 내용의 샘플은 한 번만 평가합니다.
+        """
+        keys = [
+            sample_key(self.questions[i], self.answers[i], self.contexts[i])
+            for i in indices
+        ]
+
+        # 평가가 필요한 지표 조합별로 샘플을 묶습니다.
+        groups = defaultdict(dict)
+        for i, key in zip(indices, keys):
+            missing = tuple(
+                metric.name
+                for metric in self.metrics
+                if (key, metric.name) not in self.score_cache
+            )
+            if missing:
+                groups[missing].setdefault(key, i)
+
+        for metric_names, samples in groups.items():
+            rows = list(samples.values())
+            dataset = Dataset.from_dict(
+                {
+                    "question": [self.questions[i] for i in rows],
+                    "answer": [self.answers[i] for i in rows],
+                    "contexts": [self.contexts[i] for i in rows],
+                }
+            )
+            # ragas evaluate 는 지표 객체에 llm/embeddings 를 설정했다가 끝나면 None 으로 되돌립니다.
+            # 워커 스레드와 동시에 평가해도 서로 영향을 주지 않도록 호출마다 복사본을 사용합니다.
+            metrics = [
+                copy.copy(metric)
+                for metric in self.metrics
+                if metric.name in metric_names
+            ]
+            score_df = evaluate(dataset, metrics=metrics).to_pandas()
+            for key, (_, row) in zip(samples, score_df.iterrows()):
+                for name in metric_names:
+                    value = float(row[name])
+                    # 평가에 실패한 점수(NaN)는 다음에 다시 평가하도록 저장하지 않습니다.
+                    if not math.isnan(value):
+                        self.score_cache[(key, name)] = value
+
+        return pd.DataFrame(
+            {
+                "question": [self.questions[i] for i in indices],
+                "answer": [self.answers[i] for i in indices],
+                "contexts": [self.contexts[i] for i in indices],
+                **{
+                    metric.name: [
+                        self.score_cache.get((key, metric.name), math.nan)
+                        for key in keys
+                    ]
+                    for metric in self.metrics
+                },
+            }
+        )
+
+    def evaluate_sample(self, index: int) -> pd.Series:
+        """index 샘플의 점수를 반환합니다. (백그라운드 평가에 사용)
+
+        prescreen 모드이면 로컬 지표를 먼저 계산하고, 표시된 샘플만 LLM 으로 평가합니다.
+        (표시되지 않은 샘플의 LLM 점수는 NaN)
+        """
+        if not self.prescreen:
+            return self.score_samples([index]).iloc[0]
+        local = local_metrics(
+            [self.questions[index]],
+            [self.answers[index]],
+            [self.contexts[index]],
+            embeddings=self.embeddings,
+            thresholds=self.thresholds,
+        ).iloc[0]
+        if local["flagged"]:
+            scores = self.score_samples([index]).iloc[0]
+        else:
+            scores = pd.Series(
+                {
+                    "question": self.questions[index],
+                    "answer": self.answers[index],
+                    "contexts": self.contexts[index],
+                    **{metric.name: math.nan for metric in self.metrics},
+                }
+            )
+        return pd.concat([scores, local])
+
+    def evaluate_local(self) -> pd.DataFrame:
+        """저장된 모든 샘플의 로컬 지표(LLM 호출 없음)와 flagged 여부를 반환합니다."""
+        df = local_metrics(
+            self.questions,
+            self.answers,
+            self.contexts,
+            embeddings=self.embeddings,
+            thresholds=self.thresholds,
+        )
+        df.insert(0, "question", self.questions)
+        return df
+
+    def evaluate_all(self, prescreen=False):
+        """저장된 데이터에 대해 RAG 평가를 수행합니다. (새 샘플만 평가)
+
+        prescreen=True 이면 로컬 지표로 표시된(flagged) 샘플만 LLM 으로 평가하고,
+        로컬 지표 컬럼을 함께 반환합니다. (표시되지 않은 샘플의 LLM 점수는 NaN)
+        """
         if not self.questions:
             raise ValueError(
                 "평가할 데이터가 없습니다. add_sample()을 통해 데이터를 먼저 추가해주세요."
             )
+        if not prescreen:
+            return self.score_samples(list(range(len(self.questions))))
 
-        # Dataset 생성
-        dataset = Dataset.from_dict(self.get_samples())
-
-        # 평가 수행
-        score = evaluate(dataset, metrics=[answer_relevancy, faithfulness])
-
-        return score.to_pandas()
+        local_df = self.evaluate_local().drop(columns="question")
+        flagged = [int(i) for i in np.flatnonzero(local_df["flagged"].to_numpy())]
+        result = pd.DataFrame(
+            {
+                "question": self.questions,
+                "answer": self.answers,
+                "contexts": self.contexts,
+                **{metric.name: math.nan for metric in self.metrics},
+            }
+        )
+        if flagged:
+            scores = self.score_samples(flagged)
+            for metric in self.metrics:
+                result.loc[flagged, metric.name] = scores[metric.name].to_numpy()
+        return pd.concat([result, local_df], axis=1)
 
     def evaluate_last(self):
         """마지막 샘플에 대해 RAG 평가를 수행합니다."""
@@ -48,19 +412,20 @@ class RagEvaluator:
             raise ValueError(
                 "평가할 데이터가 없습니다. add_sample()을 통해 데이터를 먼저 추가해주세요."
             )
+        return self.score_samples([len(self.questions) - 1])
 
-        last_sample = {
-            "question": [self.get_samples()["question"][-1]],
-            "answer": [self.get_samples()["answer"][-1]],
-            "contexts": [self.get_samples()["contexts"][-1]],
-        }
-
-        dataset = Dataset.from_dict(last_sample)
-        score = evaluate(dataset, metrics=[answer_relevancy, faithfulness])
-        return score.to_pandas()
+    def shutdown(self):
+        """백그라운드 평가 워커를 종료합니다."""
+        if self.worker is not None:
+            self._finalizer()
+            self.worker = None
 
     def clear(self):
-        """평가 데이터를 초기화합니다."""
+        """평가 데이터를 초기화합니다. (점수 캐시는 유지)"""
+        if self.worker is not None:
+            # 대기 중인 평가는 지워지는 샘플을 가리키므로 워커를 새로 시작합니다.
+            self._finalizer()
+            self._start_worker(self.worker.queue.maxsize, len(self.worker.threads))
         self.questions = []
         self.answers = []
         self.contexts = []
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+
+from langchain_community.vectorstores import FAISS
+
+from rag.cache import file_hash, has_faiss_index, save_faiss_index, load_faiss_index
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_ids(source_uri, page, chunks):
+    """청크 내용 기반의 고정 ID 를 생성합니다. (같은 페이지의 중복 청크는 순번으로 구분)"""
+    seen = {}
+    ids = []
+    for chunk in chunks:
+        digest = text_hash(chunk.page_content)
+        seen[digest] = seen.get(digest, 0) + 1
+        ids.append(f"{text_hash(source_uri)[:16]}:{page}:{digest}:{seen[digest]}")
+    return ids
+
+
+class IncrementalIndex:
+    """페이지/청크 fingerprint 를 추적하여 변경된 청크만 다시 임베딩하는 FAISS 인덱스입니다.
+
+    manifest.json 구조
+        {source_uri: {"file": 파일 해시, "pages": {page: {"hash": 페이지 해시, "chunks": [청크 ID]}}}}
+    """
+
+    def __init__(self, index_path, embeddings):
+        self.index_path = index_path
+        self.embeddings = embeddings
+        self.manifest_path = os.path.join(index_path, "manifest.json")
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path) or not has_faiss_index(
+            self.index_path
+        ):
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def update(self, source_uris, load_documents, split_documents):
+        """변경된 페이지의 청크만 추가하고, 사라진 청크는 인덱스에서 삭제합니다.
+
+        Args:
+            source_uris: 인덱싱할 파일 경로 목록
+            load_documents: 파일 경로 목록을 받아 페이지 단위 Document 를 반환하는 함수
+            split_documents: Document 목록을 받아 청크 목록을 반환하는 함수
+        """
+        old_manifest = self.load_manifest()
+        vectorstore = None
+        if old_manifest:
+            # 인덱스를 수정해야 하므로 메모리 매핑 없이 로드합니다.
+            vectorstore = load_faiss_index(self.index_path, self.embeddings, mmap=False)
+
+        manifest = {}
+        new_chunks, new_ids = [], []
+        reused_chunks = {}
+        for source_uri in source_uris:
+            old_entry = old_manifest.get(source_uri, {})
+            current_file_hash = file_hash(source_uri)
+            if old_entry.get("file") == current_file_hash:
+                # 파일이 변경되지 않았다면 파싱하지 않고 그대로 유지합니다.
+                manifest[source_uri] = old_entry
+                continue
+
+            old_pages = old_entry.get("pages", {})
+            old_chunk_ids = {
+                chunk_id for page in old_pages.values() for chunk_id in page["chunks"]
+            }
+            pages = {}
+            for i, doc in enumerate(load_documents([source_uri])):
+                page = str(doc.metadata.get("page", i))
+                page_hash = text_hash(doc.page_content)
+                if old_pages.get(page, {}).get("hash") == page_hash:
+                    pages[page] = old_pages[page]
+                    continue
+
+                chunks = split_documents([doc])
+                ids = chunk_ids(source_uri, page, chunks)
+                for chunk, chunk_id in zip(chunks, ids):
+                    # 내용이 같은 청크는 기존 벡터를 재사용합니다.
+                    if chunk_id not in old_chunk_ids:
+                        new_chunks.append(chunk)
+                        new_ids.append(chunk_id)
+                    else:
+                        reused_chunks[chunk_id] = chunk
+                pages[page] = {"hash": page_hash, "chunks": ids}
+            manifest[source_uri] = {"file": current_file_hash, "pages": pages}
+
+        keep_ids = {
+            chunk_id
+            for entry in manifest.values()
+            for page in entry["pages"].values()
+            for chunk_id in page["chunks"]
+        }
+        old_ids = {
+            chunk_id
+            for entry in old_manifest.values()
+            for page in entry["pages"].values()
+            for chunk_id in page["chunks"]
+        }
+        removed_ids = list(old_ids - keep_ids)
+
+        if vectorstore is not None and removed_ids:
+            vectorstore.delete(removed_ids)
+        if vectorstore is not None and reused_chunks:
+            # 재사용한 청크도 페이지 안의 위치(start_index 등)가 바뀔 수 있으므로 metadata 를 갱신합니다.
+            vectorstore.docstore.delete(list(reused_chunks))
+            vectorstore.docstore.add(reused_chunks)
+        if new_chunks:
+            if vectorstore is None:
+                vectorstore = FAISS.from_documents(
+                    new_chunks, self.embeddings, ids=new_ids
+                )
+            else:
+                vectorstore.add_documents(new_chunks, ids=new_ids)
+
+        if vectorstore is None:
+            raise ValueError("인덱싱할 문서가 없습니다.")
+
+        self.stats = {"added": len(new_ids), "removed": len(removed_ids)}
+        if new_chunks or removed_ids or manifest != old_manifest:
+            save_faiss_index(vectorstore, self.index_path)
+            self.save_manifest(manifest)
+        return vectorstore
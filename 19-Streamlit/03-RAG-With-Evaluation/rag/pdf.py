@@ -1,15 +1,79 @@
 from rag.base import RetrievalChain
 from langchain_community.document_loaders import PDFPlumberLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from rag.splitter import FastRecursiveCharacterTextSplitter
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Annotated
 
 
+def count_pdf_pages(source_uri: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(source_uri) as pdf:
+        return len(pdf.pages)
+
+
+def load_pdf_pages(source_uri: str, page_numbers: List[int], total_pages: int):
+    """PDF 의 지정한 페이지(1부터 시작)만 PDFPlumberLoader 로 로드합니다.
+
+    프로세스 풀의 작업 단위로 사용되며, 순차 로드와 동일한 Document 를 반환합니다.
+    """
+    import pdfplumber
+
+    # 작업 프로세스 안에서만 pdfplumber.open 이 지정한 페이지만 열도록 감쌉니다.
+    open_pdf = pdfplumber.open
+    pdfplumber.open = lambda *args, **kwargs: open_pdf(
+        *args, pages=page_numbers, **kwargs
+    )
+    try:
+        docs = PDFPlumberLoader(source_uri).load()
+    finally:
+        pdfplumber.open = open_pdf
+
+    # 일부 페이지만 열었으므로 전체 페이지 수를 원래 값으로 되돌립니다.
+    for doc in docs:
+        if "total_pages" in doc.metadata:
+            doc.metadata["total_pages"] = total_pages
+    return docs
+
+
+def load_pdfs_parallel(
+    source_uris: List[str], num_workers: int, pages_per_task: int = 8
+):
+    """여러 PDF 를 페이지 단위 작업으로 나누어 프로세스 풀에서 로드합니다.
+
+    결과는 파일 순서, 페이지 순서를 그대로 유지합니다.
+    """
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        page_counts = list(executor.map(count_pdf_pages, source_uris))
+
+        tasks = []
+        for source_uri, total_pages in zip(source_uris, page_counts):
+            for start in range(1, total_pages + 1, pages_per_task):
+                end = min(start + pages_per_task, total_pages + 1)
+                tasks.append((source_uri, list(range(start, end)), total_pages))
+
+        docs = []
+        for page_docs in executor.map(load_pdf_pages, *zip(*tasks)):
+            docs.extend(page_docs)
+    return docs
+
+
 class PDFRetrievalChain(RetrievalChain):
-    def __init__(self, source_uri: Annotated[str, "Source URI"]):
-        self.source_uri = source_uri
-        self.k = 6
+    def __init__(self, source_uri: Annotated[str, "Source URI"], **kwargs):
+        super().__init__(source_uri=source_uri, **kwargs)
+        # PDF 로드에 사용할 프로세스 수 (1 이면 순차적으로 로드합니다)
+        self.num_workers = kwargs.get("num_workers", 1)
+        # 프로세스 풀 작업 하나가 처리할 페이지 수
+        self.pages_per_task = kwargs.get("pages_per_task", 8)
+        # 문서 분할에 사용할 프로세스 수 (1 이면 현재 프로세스에서 분할합니다)
+        self.split_workers = kwargs.get("split_workers", 1)
 
     def load_documents(self, source_uris: List[str]):
+        if self.num_workers > 1:
+            return load_pdfs_parallel(
+                source_uris, self.num_workers, self.pages_per_task
+            )
+
         docs = []
         for source_uri in source_uris:
             loader = PDFPlumberLoader(source_uri)
@@ -17,5 +81,15 @@ class PDFRetrievalChain(RetrievalChain):
 
         return docs
 
+    def lazy_load_documents(self, source_uris: List[str]):
+        for source_uri in source_uris:
+            yield from PDFPlumberLoader(source_uri).lazy_load()
+
     def create_text_splitter(self):
-        return RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50)
+        # start_index 는 검색 결과를 합칠 때(format_docs) 실제로 이어진 청크인지 확인하는 데 사용합니다.
+        return FastRecursiveCharacterTextSplitter(
+            chunk_size=300,
+            chunk_overlap=50,
+            add_start_index=True,
+            num_workers=self.split_workers,
+        )